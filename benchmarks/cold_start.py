@@ -0,0 +1,40 @@
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+COMMANDS = {
+    "--help": ["main.py", "--help"],
+    "list-snapshots": ["main.py", "list-snapshots"],
+    "crawl --help": ["main.py", "crawl", "--help"],
+    "analyze --help": ["main.py", "analyze", "--help"],
+    # what crawl and analyze import once they start working
+    "crawl stack": ["-c", "import src.crawler"],
+    "analyze stack": ["-c", "import src.analysis.data_processing_orchestrator"],
+}
+
+
+def cold_start(args: list[str], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a fresh interpreter for each CLI command")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, command in COMMANDS.items():
+        print(f"{name:<28} {cold_start(command, args.repeat) * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import csv
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.config import MainConfig
+
+
+def load_descriptions(data_dir: Path = MainConfig.DATA_DIR, limit: int | None = None) -> list[str]:
+    csv.field_size_limit(sys.maxsize)
+
+    descriptions = []
+    for csv_path in sorted(data_dir.glob(f"*/*/{MainConfig.CSV_NAME}")):
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            descriptions.extend(
+                row["description"] for row in csv.DictReader(f) if row.get("description")
+            )
+
+    if not descriptions:
+        raise SystemExit(f"No stored descriptions found under {data_dir}")
+
+    return descriptions[:limit]
+
+
+def best_time(func: Callable[[], object], repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def report(name: str, seconds: float, count: int, unit: str = "items") -> None:
+    print(f"{name:<28} {seconds * 1000:10.2f} ms  {count / seconds:12.0f} {unit}/s")
+
+
+@contextmanager
+def temporary_data_dir() -> Iterator[Path]:
+    # synthetic locations are all in the seed dictionary, nothing is translated online
+    data_dir = MainConfig.DATA_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        MainConfig.DATA_DIR = Path(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            MainConfig.DATA_DIR = data_dir
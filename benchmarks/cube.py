@@ -0,0 +1,115 @@
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.common import best_time, temporary_data_dir
+from benchmarks.synthetic import raw_snapshot_frame
+from src.analysis.aggregates import RunningAggregates
+from src.analysis.cube import build_cube, load_cube, query_cube, save_cube
+from src.analysis.encoding import densify, dummy_counts
+from src.analysis.plots import DAYS_ORDER, PLOTS
+from src.analysis.rendering import _payload_hash
+from src.config import MainConfig
+from src.storage import save_snapshot
+
+# the row aggregations plots.py ran on the clean frame before the cube
+LEGACY_AGGREGATIONS = {
+    "experience_bar": lambda df: df["experience_years"].value_counts(dropna=True).sort_index(),
+    "publishing_date_bar": lambda df: df["date"].value_counts(dropna=True).sort_index(),
+    "publishing_day_bar": lambda df: df["date"].dt.day_name().value_counts().reindex(DAYS_ORDER),
+    "work_location_pie": lambda df: (dummy_counts(df, "loc_").nlargest(10), df.shape[0]),
+    "salary_comparison_bar": lambda df: pd.DataFrame({
+        "lower": df["lower_salary_range"].value_counts(sort=False),
+        "upper": df["upper_salary_range"].value_counts(sort=False),
+    }),
+    "technologies_bar": lambda df: dummy_counts(df, "tech_").nlargest(20),
+}
+
+
+def mismatched_hashes(expected: dict, cube: pd.DataFrame) -> list[str]:
+    # the hashes that decide whether render_plots redraws a plot
+    return [
+        name for name, (aggregate, _) in PLOTS.items()
+        if _payload_hash(expected[name], "png", 100) != _payload_hash(aggregate(cube), "png", 100)
+    ]
+
+
+def streamed_payloads(raw: pd.DataFrame) -> dict:
+    aggregates = RunningAggregates()
+    for item in raw.to_dict("records"):
+        aggregates.update(item)
+
+    return aggregates.plot_payloads()
+
+
+def timed(name: str, func, repeat: int) -> float:
+    seconds = best_time(func, repeat)
+    print(f"{name:<34} {seconds * 1000:10.2f} ms")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the cube gives the plots' row aggregations and time both"
+    )
+    parser.add_argument("--vacancies", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from src.analysis.data_cleaning import clean_data
+
+    with temporary_data_dir() as data_dir:
+        snapshot = data_dir / "python" / "2026-01-01_00-00-00"
+        raw = raw_snapshot_frame(args.vacancies)
+        save_snapshot(raw, snapshot / MainConfig.PARQUET_NAME)
+        df = clean_data(snapshot, deduplicate=False)
+
+        start = time.perf_counter()
+        cube = build_cube(df)
+        save_cube(cube, snapshot)
+        print(f"{'build + save cube':<34} {(time.perf_counter() - start) * 1000:10.2f} ms")
+        print(f"cube: {len(cube)} cells, "
+              f"{(snapshot / MainConfig.CUBE_NAME).stat().st_size / 2 ** 10:.1f} KiB "
+              f"for {len(df)} vacancies\n")
+
+        mismatches = {}
+        for source, payloads in (
+            ("row aggregations", {name: aggregate(df) for name, aggregate in LEGACY_AGGREGATIONS.items()}),
+            ("streaming aggregates", streamed_payloads(raw)),
+        ):
+            mismatches[source] = mismatched_hashes(payloads, cube)
+            print(f"plot hashes equal to the {source}: "
+                  f"{len(PLOTS) - len(mismatches[source])}/{len(PLOTS)} {mismatches[source] or ''}")
+
+        query = {"technology": "django", "location": "Kyiv",
+                 "experience_years": lambda years: years >= 3}
+        rows = df[(df["tech_django"] == 1) & (df["loc_Kyiv"] == 1) & (df["experience_years"] >= 3)]
+        print(f"Django in Kyiv with 3+ years: rows {len(rows)}, cube {query_cube(cube, **query)}\n")
+
+        timed("plot payloads from rows", lambda: [
+            aggregate(df) for aggregate in LEGACY_AGGREGATIONS.values()
+        ], args.repeat)
+        timed("plot payloads from cube", lambda: [
+            aggregate(cube) for aggregate, _ in PLOTS.values()
+        ], args.repeat)
+        save_snapshot(densify(df), snapshot / MainConfig.CLEAN_PARQUET_NAME)
+        timed("plot payloads from clean parquet", lambda: [
+            aggregate(df) for df in [pd.read_parquet(snapshot / MainConfig.CLEAN_PARQUET_NAME)]
+            for aggregate in LEGACY_AGGREGATIONS.values()
+        ], args.repeat)
+        timed("plot payloads from cube on disk", lambda: [
+            aggregate(cube) for cube in [load_cube(snapshot)] for aggregate, _ in PLOTS.values()
+        ], args.repeat)
+        timed("ad-hoc query from rows", lambda: len(
+            df[(df["tech_django"] == 1) & (df["loc_Kyiv"] == 1) & (df["experience_years"] >= 3)]
+        ), args.repeat)
+        timed("ad-hoc query from cube", lambda: query_cube(cube, **query), args.repeat)
+
+    if any(mismatches.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_vacancies
+from src.analysis.dedup import canonical_urls
+
+
+def snapshot_with_reposts(vacancies: int, reposts: int, seed: int = 0) -> tuple[pd.DataFrame, dict]:
+    # reposts keep the description of an earlier vacancy with one word edited
+    rng = random.Random(seed)
+    rows = [
+        (vacancy["url"], "\n".join(vacancy["description"]))
+        for vacancy in synthetic_vacancies(vacancies, seed)
+    ]
+
+    originals = {}
+    for i in range(reposts):
+        url, description = rows[rng.randrange(vacancies)]
+        words = description.split(" ")
+        words[rng.randrange(len(words))] = "edited"
+
+        repost_url = f"{url}repost-{i}/"
+        originals[repost_url] = url
+        rows.append((repost_url, " ".join(words)))
+
+    return pd.DataFrame(rows, columns=["url", "description"]), originals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time MinHash/LSH dedup against a growing signature index"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000])
+    parser.add_argument("--repost-share", type=float, default=0.05)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        df, originals = snapshot_with_reposts(size, int(size * args.repost_share))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            warehouse = Path(tmp) / "warehouse.sqlite"
+
+            start = time.perf_counter()
+            canonical = canonical_urls(df["url"], df["description"], warehouse)
+            first = time.perf_counter() - start
+
+            # the next snapshot repeats most urls and only hashes the new ones
+            next_df, _ = snapshot_with_reposts(size + size // 10, 0)
+            start = time.perf_counter()
+            canonical_urls(next_df["url"], next_df["description"], warehouse)
+            incremental = time.perf_counter() - start
+
+        canonical_of = dict(zip(df["url"], canonical))
+        found = sum(canonical_of[url] == original for url, original in originals.items())
+        false = int((canonical[:size] != df["url"][:size]).sum())
+        print(
+            f"{size:>7} vacancies  index {first * 1000:9.1f} ms "
+            f"({len(df) / first:7.0f}/s)  next snapshot {incremental * 1000:8.1f} ms  "
+            f"reposts found {found}/{len(originals)}  false matches {false}"
+        )
+
+
+if __name__ == "__main__":
+    main()
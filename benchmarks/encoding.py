@@ -0,0 +1,96 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.analysis.encoding import dummy_counts, sparse_dummies
+from src.config import MainConfig
+
+CITIES = [
+    "Kyiv", "Lviv", "Kharkiv", "Dnipro", "Odesa", "Vinnytsia", "Zaporizhzhia",
+    "Ivano-Frankivsk", "Ternopil", "Chernivtsi", "Uzhhorod", "Lutsk", "Rivne",
+    "remote", "abroad",
+]
+
+
+def synthetic_frame(rows: int, snapshots: int, seed: int = 0) -> pd.DataFrame:
+    # the same vacancies show up in many daily snapshots
+    rng = random.Random(seed)
+    keywords = sorted(MainConfig.TECH_KEYWORDS)
+
+    vacancies = [
+        (
+            ",".join(rng.sample(keywords, rng.randint(0, 10))),
+            ", ".join(rng.sample(CITIES, rng.randint(1, 4))),
+        )
+        for _ in range(max(rows // snapshots, 1))
+    ]
+
+    return pd.DataFrame(
+        [rng.choice(vacancies) for _ in range(rows)],
+        columns=["technologies", "location"],
+    )
+
+
+def legacy_dummies(df: pd.DataFrame) -> pd.DataFrame:
+    loc_dummies = df["location"].str.get_dummies(sep=", ").add_prefix("loc_")
+    tech_dummies = df["technologies"].str.get_dummies(sep=",").add_prefix("tech_")
+
+    return pd.concat([tech_dummies, loc_dummies], axis=1)
+
+
+def new_dummies(df: pd.DataFrame) -> pd.DataFrame:
+    loc_dummies = sparse_dummies(df["location"], sep=", ", prefix="loc_")
+    tech_dummies = sparse_dummies(
+        df["technologies"], sep=",", prefix="tech_", vocabulary=MainConfig.TECH_KEYWORDS
+    )
+
+    return pd.concat([tech_dummies, loc_dummies], axis=1)
+
+
+def measure(name: str, func, df: pd.DataFrame) -> pd.DataFrame:
+    tracemalloc.start()
+    start = time.perf_counter()
+    dummies = func(df)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = dummies.memory_usage(deep=True).sum()
+    print(
+        f"{name:<16} {seconds * 1000:10.0f} ms  {size / 2**20:9.1f} MiB frame"
+        f"  {peak / 2**20:9.1f} MiB peak  {dummies.shape[1]} columns"
+    )
+    return dummies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare dense get_dummies with the sparse tech/location encoding"
+    )
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--snapshots", type=int, default=30)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.snapshots)
+    print(f"Synthetic frame: {len(df)} rows from {args.snapshots} snapshots")
+
+    legacy = measure("dense legacy", legacy_dummies, df)
+    sparse = measure("sparse", new_dummies, df)
+
+    for prefix in ("tech_", "loc_"):
+        expected = legacy.filter(like=prefix).sum()
+        expected.index = expected.index.str.removeprefix(prefix)
+        # get_dummies turns an empty technologies string into a "tech_" column
+        expected = expected[(expected > 0) & (expected.index != "")].sort_index()
+
+        if not expected.equals(dummy_counts(sparse, prefix).sort_index().astype(expected.dtype)):
+            raise SystemExit(f"{prefix} counts differ")
+
+    print("Counts identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import json
+import re
+from pathlib import Path
+
+from benchmarks.common import best_time, load_descriptions, report
+from src.config import ExtractExperiencePatterns, MainConfig
+from src.scrape.extractors import extract_experience
+
+
+CASES_PATH = Path(__file__).parent / "fixtures" / "experience_cases.json"
+
+LEGACY_DATE_GUARD = re.compile(r"\d{2}[./-]\d{2}[./-]\d{4}|\d{4}[./-]\d{2}[./-]\d{2}")
+
+
+def legacy_extract_experience(text: str) -> float | None:
+    clean_text = LEGACY_DATE_GUARD.sub(" ", text)
+    statements = ExtractExperiencePatterns.SPLIT_PATTERN.split(clean_text)
+    result = []
+
+    for statement in statements:
+        if ExtractExperiencePatterns.NON_REQ_CONTEXT.search(statement):
+            continue
+
+        for match in ExtractExperiencePatterns.YEARS_PATTERN.finditer(statement):
+            val = float(match.group(1).replace(",", "."))
+            if 0 < val < 15:
+                result.append(val)
+
+        for match in ExtractExperiencePatterns.MONTHS_PATTERN.finditer(statement):
+            val = float(match.group(1).replace(",", ".")) / 12
+            result.append(val)
+
+    return max(result, default=None)
+
+
+def failed_cases() -> list[tuple[str, float | None, float | None]]:
+    with open(CASES_PATH, encoding="utf-8") as f:
+        cases = json.load(f)
+
+    return [
+        (case["text"], case["years"], extract_experience(case["text"]))
+        for case in cases
+        if extract_experience(case["text"]) != case["years"]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the experience extractor against the committed cases and time it on stored descriptions"
+    )
+    parser.add_argument("--data-dir", type=Path, default=MainConfig.DATA_DIR)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The committed cases run without stored data and fail the run on any miss
+    failures = failed_cases()
+    for text, expected, actual in failures:
+        print(f"FAIL expected={expected} got={actual}: {text!r}")
+    if failures:
+        raise SystemExit(f"{len(failures)} experience cases failed")
+    print(f"All experience cases passed ({CASES_PATH.name})")
+
+    if not any(args.data_dir.glob(f"*/*/{MainConfig.CSV_NAME}")):
+        print(f"No stored descriptions under {args.data_dir}, skipping the corpus check")
+        return
+
+    descriptions = load_descriptions(args.data_dir, limit=args.limit)
+    print(f"Corpus: {len(descriptions)} descriptions")
+
+    mismatches = [
+        d for d in descriptions
+        if legacy_extract_experience(d) != extract_experience(d)
+    ]
+
+    for name, extractor in (
+        ("legacy per-statement loop", legacy_extract_experience),
+        ("fused single scan", extract_experience),
+    ):
+        seconds = best_time(lambda: [extractor(d) for d in descriptions], args.repeat)
+        report(name, seconds, len(descriptions), "descriptions")
+
+    if mismatches:
+        for description in mismatches[:5]:
+            print(
+                f"MISMATCH legacy={legacy_extract_experience(description)} "
+                f"fused={extract_experience(description)}: {description[:200]}"
+            )
+        raise SystemExit(f"{len(mismatches)} descriptions differ")
+
+    print("Results identical on all descriptions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import sys
+
+from scrapy.http import HtmlResponse
+
+from benchmarks.common import best_time, report
+from benchmarks.synthetic import fixture_pages, synthetic_vacancies, vacancy_page
+from src.scrape.extraction import EXTRACTORS
+
+
+def responses(pages: dict[str, str]) -> list[HtmlResponse]:
+    return [
+        HtmlResponse(url=url, body=body.encode("utf-8"), encoding="utf-8")
+        for url, body in pages.items()
+    ]
+
+
+def check_parity(pages: dict[str, str]) -> int:
+    # every backend must return what the parsel backend returns
+    extractors = {name: cls() for name, cls in EXTRACTORS.items()}
+    mismatches = 0
+
+    for response in responses(pages):
+        expected = extractors["parsel"](response)
+        for name, extractor in extractors.items():
+            result = extractor(response)
+            if result != expected:
+                mismatches += 1
+                print(f"{name} differs on {response.url}:")
+                for field in expected[0]:
+                    if result[0][field] != expected[0][field]:
+                        print(f"  {field}: {result[0][field]!r} != {expected[0][field]!r}")
+                if result[1] != expected[1]:
+                    print("  description text differs")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the detail page extractors agree (exits 1 if not) and time them"
+    )
+    parser.add_argument("--vacancies", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = fixture_pages()
+    pages.update(
+        (vacancy["url"], vacancy_page(vacancy))
+        for vacancy in synthetic_vacancies(args.vacancies)
+    )
+
+    mismatches = check_parity(pages)
+    print(f"parity: {len(pages) - mismatches}/{len(pages)} pages identical across backends\n")
+    if mismatches:
+        sys.exit(1)
+
+    for name, cls in EXTRACTORS.items():
+        extractor = cls()
+
+        # a fresh response per page, as in a crawl, so parsing is included
+        def parse_and_extract():
+            for response in responses(pages):
+                extractor(response)
+
+        report(f"{name} parse+extract", best_time(parse_and_extract, args.repeat), len(pages), "pages")
+
+        parsed = responses(pages)
+        for response in parsed:
+            response.selector
+
+        def extract():
+            for response in parsed:
+                extractor(response)
+
+        report(f"{name} extract", best_time(extract, args.repeat), len(pages), "pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+
+import scrapy
+from itemadapter import ItemAdapter
+from itemloaders.processors import Identity, Join, MapCompose, TakeFirst
+from scrapy.exporters import CsvItemExporter, JsonLinesItemExporter
+from scrapy.extensions.postprocessing import GzipPlugin, PostProcessingManager
+from scrapy.http import HtmlResponse
+from scrapy.loader import ItemLoader
+
+from benchmarks.synthetic import synthetic_vacancies, vacancy_page
+from src.config import MainConfig
+from src.scrape.extraction import get_extractor
+from src.scrape.extractors import extract_vacancy_fields
+from src.scrape.items import clean_salary, clean_text
+from src.scrape.postprocessing import ZstdPlugin
+from src.scrape.spiders.vacancies_spider import VacanciesSpider
+
+EXTRACTOR = get_extractor(MainConfig.CRAWLER_SETTINGS["DETAIL_EXTRACTOR"])
+
+
+# the scrapy.Item and loader the spider yielded before the Vacancy dataclass
+class VacancyItem(scrapy.Item):
+    name = scrapy.Field()
+    url = scrapy.Field()
+    company_name = scrapy.Field()
+    company_url = scrapy.Field()
+    location = scrapy.Field()
+    date = scrapy.Field()
+    salary = scrapy.Field()
+    experience_years = scrapy.Field()
+    technologies = scrapy.Field()
+    description = scrapy.Field()
+
+
+class VacancyLoader(ItemLoader):
+    default_output_processor = TakeFirst()
+
+    name_in = MapCompose(str.strip)
+    company_name_in = MapCompose(str.strip)
+    location_in = MapCompose(str.strip)
+    date_in = MapCompose(str.strip)
+    salary_in = MapCompose(clean_salary)
+    description_in = MapCompose(clean_text)
+
+    technologies_out = Identity()
+    description_out = Join(separator="\n")
+
+
+def legacy_vacancy(response, vacancy_text, xp_years, found_tech) -> VacancyItem:
+    # the scrapy.Item path parse_single_vacancy used before the Vacancy dataclass
+    vl = VacancyLoader(item=VacancyItem(), response=response)
+    vl.add_css("name", ".g-h2::text")
+    vl.add_value("url", response.url)
+    vl.add_css("company_name", ".b-compinfo .info .l-n a::text")
+    vl.add_css("company_url", ".b-compinfo .info .l-n a::attr(href)")
+    vl.add_css("location", ".place::text")
+    vl.add_css("date", ".date::text")
+    vl.add_css("salary", ".salary::text")
+    vl.add_value("description", vacancy_text)
+    if xp_years:
+        vl.add_value("experience_years", xp_years)
+    vl.add_value("technologies", list(found_tech))
+
+    return vl.load_item()
+
+
+def lean_vacancy(response, vacancy_text, xp_years, found_tech):
+    fields, _ = EXTRACTOR(response)
+    return VacanciesSpider.build_vacancy(response.url, fields, vacancy_text, xp_years, found_tech)
+
+
+def prepare(pages: int) -> list[tuple]:
+    inputs = []
+    for vacancy in synthetic_vacancies(pages):
+        response = HtmlResponse(
+            url=vacancy["url"], body=vacancy_page(vacancy).encode("utf-8"), encoding="utf-8"
+        )
+        raw_text = response.css(".vacancy-section ::text").getall()
+        inputs.append((response, *extract_vacancy_fields(raw_text)))
+
+    return inputs
+
+
+def build(name: str, func, inputs: list[tuple], items: int) -> list:
+    # parse trees are cached on the responses by prepare(), so only the
+    # items themselves are measured; tracemalloc slows allocation down,
+    # so time and memory come from separate passes
+    start = time.perf_counter()
+    built = [func(*inputs[i % len(inputs)]) for i in range(items)]
+    seconds = time.perf_counter() - start
+    del built
+
+    tracemalloc.start()
+    built = [func(*inputs[i % len(inputs)]) for i in range(items)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<22} {seconds * 1000:9.1f} ms  {items / seconds:9.0f} items/s  "
+        f"held {current / 2 ** 20:7.1f} MiB  peak {peak / 2 ** 20:7.1f} MiB"
+    )
+    return built
+
+
+def export(name: str, exporter_class, plugins: list, items: list, path: Path) -> None:
+    options = {"postprocessing": plugins, "gzip_compresslevel": 6} if plugins else {}
+    fields = MainConfig.CRAWLER_SETTINGS["FEED_EXPORT_FIELDS"]
+
+    def write():
+        with open(path, "wb") as f:
+            file = PostProcessingManager(plugins, f, options) if plugins else f
+            exporter = exporter_class(file, fields_to_export=fields)
+            exporter.start_exporting()
+            for item in items:
+                exporter.export_item(item)
+            exporter.finish_exporting()
+            if plugins:
+                file.close()
+
+    start = time.perf_counter()
+    write()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    write()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<22} {seconds * 1000:9.1f} ms  {len(items) / seconds:9.0f} items/s  "
+        f"{path.stat().st_size / 2 ** 20:7.1f} MiB on disk  peak {peak / 2 ** 20:7.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the scrapy.Item loader path with the Vacancy dataclass "
+        "and time compressed feed exports"
+    )
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument(
+        "--pages", type=int, default=5_000,
+        help="distinct pages cycled through (repeats flatter the compression ratios)",
+    )
+    args = parser.parse_args()
+
+    inputs = prepare(args.pages)
+
+    legacy = build("VacancyItem + loader", legacy_vacancy, inputs, args.items)
+    lean = build("Vacancy dataclass", lean_vacancy, inputs, args.items)
+
+    mismatches = sum(
+        {k: v for k, v in ItemAdapter(old).asdict().items() if v not in (None, "", [])}
+        != {k: v for k, v in asdict(new).items() if v not in (None, "", [])}
+        for old, new in zip(legacy, lean)
+    )
+    print(f"field mismatches: {mismatches}/{args.items}")
+    del legacy
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        export("csv", CsvItemExporter, [], lean, tmp / "feed.csv")
+        export("jsonl", JsonLinesItemExporter, [], lean, tmp / "feed.jsonl")
+        export("jsonl.gz", JsonLinesItemExporter, [GzipPlugin], lean, tmp / "feed.jsonl.gz")
+        export("jsonl.zst", JsonLinesItemExporter, [ZstdPlugin], lean, tmp / "feed.jsonl.zst")
+        export("csv.zst", CsvItemExporter, [ZstdPlugin], lean, tmp / "feed.csv.zst")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import random
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_time, report
+from src.analysis.normalization import parse_dates, parse_salaries
+
+UKR_MONTHS = {
+    "січня": "01", "лютого": "02", "березня": "03", "квітня": "04",
+    "травня": "05", "червня": "06", "липня": "07", "серпня": "08",
+    "вересня": "09", "жовтня": "10", "листопада": "11", "грудня": "12"
+}
+
+
+def legacy_parse_salaries(salary: pd.Series) -> pd.DataFrame:
+    df = pd.DataFrame({"salary": salary})
+
+    SALARY_PATTERN = "(\\d+)\\D*(\\d+)?"
+    salary_nums = df["salary"].str.extract(SALARY_PATTERN).astype(float)
+
+    df["lower_salary"] = salary_nums[0]
+    df["upper_salary"] = salary_nums[1]
+
+    is_to = df["salary"].str.startswith("до", na=False)
+    is_from = df["salary"].str.startswith("від", na=False)
+
+    df.loc[is_to, "upper_salary"] = df.loc[is_to, "lower_salary"]
+    df.loc[is_to, "lower_salary"] = np.nan
+    df.loc[is_from, "upper_salary"] = np.nan
+
+    for col in ["lower_salary", "upper_salary"]:
+        df.loc[df[col] <= 10, col] *= 1000
+        df.loc[df[col] <= 100, col] *= 100
+
+    return df[["lower_salary", "upper_salary"]]
+
+
+def legacy_parse_dates(dates: pd.Series) -> pd.Series:
+    return pd.to_datetime(dates.replace(UKR_MONTHS, regex=True), format="%d %m %Y")
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    months = list(UKR_MONTHS)
+
+    def salary():
+        low = rng.randrange(500, 8000, 100)
+        kind = rng.random()
+        if kind < 0.4:
+            return None
+        if kind < 0.7:
+            return f"${low}–{low + rng.randrange(500, 3000, 100)}"
+        if kind < 0.8:
+            return f"від ${low}"
+        if kind < 0.9:
+            return f"до ${low}"
+        return f"${low}"
+
+    return pd.DataFrame({
+        "salary": pd.Series([salary() for _ in range(rows)], dtype="string"),
+        "date": pd.Series(
+            [
+                f"{rng.randint(1, 28)} {rng.choice(months)} {rng.choice([2025, 2026])}"
+                for _ in range(rows)
+            ],
+            dtype="string",
+        ),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the salary/date normalization with the old clean_data code"
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    print(f"Synthetic frame: {len(df)} rows, {df['salary'].nunique()} distinct salaries")
+
+    for name, func, column in (
+        ("legacy salaries", legacy_parse_salaries, "salary"),
+        ("normalized salaries", parse_salaries, "salary"),
+        ("legacy dates", legacy_parse_dates, "date"),
+        ("normalized dates", parse_dates, "date"),
+    ):
+        seconds = best_time(lambda: func(df[column]), args.repeat)
+        report(name, seconds, len(df), "rows")
+
+    legacy = legacy_parse_salaries(df["salary"])
+    salaries = parse_salaries(df["salary"])[["lower_salary", "upper_salary"]]
+    salary_mismatches = (~((legacy == salaries) | (legacy.isna() & salaries.isna()))).any(axis=1)
+    date_mismatches = legacy_parse_dates(df["date"]) != parse_dates(df["date"])
+
+    if salary_mismatches.any() or date_mismatches.any():
+        print(df[salary_mismatches | date_mismatches].head())
+        raise SystemExit(
+            f"{salary_mismatches.sum()} salaries and {date_mismatches.sum()} dates differ"
+        )
+
+    print("Results identical on all rows")
+
+
+if __name__ == "__main__":
+    main()
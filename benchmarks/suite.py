@@ -0,0 +1,175 @@
+import argparse
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+from scrapy.crawler import Crawler
+from scrapy.http import HtmlResponse
+
+from benchmarks.common import best_time, report, temporary_data_dir
+from benchmarks.synthetic import (
+    fixture_pages,
+    raw_snapshot_frame,
+    synthetic_vacancies,
+    vacancy_page,
+)
+from src.config import MainConfig
+from src.crawler import SPIDERS
+from src.scrape.extractors import extract_experience, extract_tech_stack
+
+HISTORY_PATH = Path(__file__).parent / "history.json"
+
+
+def collect(async_gen) -> list:
+    # parse_single_vacancy only awaits with a parse pool, so it can be
+    # stepped without a reactor
+    items = []
+    while True:
+        try:
+            async_gen.__anext__().send(None)
+        except StopIteration as item:
+            items.append(item.value)
+        except StopAsyncIteration:
+            return items
+
+
+def bench_parsing(pages: dict[str, str], repeat: int) -> dict:
+    spider = SPIDERS["python"].from_crawler(Crawler(SPIDERS["python"], MainConfig.CRAWLER_SETTINGS))
+    responses = [
+        HtmlResponse(url=url, body=body.encode("utf-8"), encoding="utf-8")
+        for url, body in pages.items()
+    ]
+
+    def parse_all():
+        for response in responses:
+            collect(spider.parse_single_vacancy(response))
+
+    seconds = best_time(parse_all, repeat)
+    report("parse_single_vacancy", seconds, len(responses), "items")
+    return {"items": len(responses), "seconds": seconds, "items_per_second": len(responses) / seconds}
+
+
+def bench_extractors(descriptions: list[str], repeat: int) -> dict:
+    results = {}
+    for name, extractor in (
+        ("extract_experience", extract_experience),
+        ("extract_tech_stack", extract_tech_stack),
+    ):
+        seconds = best_time(lambda: [extractor(d) for d in descriptions], repeat)
+        report(name, seconds, len(descriptions), "descriptions")
+        results[name] = {"seconds": seconds, "items_per_second": len(descriptions) / seconds}
+
+    return results
+
+
+def bench_analysis(vacancies: int, repeat: int) -> dict:
+    from src.analysis.cube import build_cube
+    from src.analysis.data_cleaning import clean_data
+    from src.analysis.rendering import render_plots
+    from src.instrumentation import METRICS
+    from src.storage import save_snapshot
+
+    with temporary_data_dir() as data_dir:
+        snapshot = data_dir / "python" / "2026-01-01_00-00-00"
+        save_snapshot(raw_snapshot_frame(vacancies), snapshot / MainConfig.PARQUET_NAME)
+
+        seconds = best_time(lambda: clean_data(snapshot), repeat)
+        report("clean_data", seconds, vacancies, "rows")
+        results = {"clean_data": {"seconds": seconds, "rows_per_second": vacancies / seconds}}
+
+        df = clean_data(snapshot)
+        METRICS.reset()
+        start = time.perf_counter()
+        render_plots(build_cube(df), snapshot, workers=1, skip_unchanged=False)
+        results["plots"] = {
+            "seconds": time.perf_counter() - start,
+            "per_plot": {
+                name.removeprefix("plot."): sum(values)
+                for name, values in METRICS.timings.items()
+                if name.startswith("plot.")
+            },
+        }
+
+    for name, seconds in results["plots"]["per_plot"].items():
+        print(f"{name:<28} {seconds * 1000:10.2f} ms")
+
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"]).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return f"{revision}-dirty" if dirty else revision
+
+
+def compare(previous: dict, current: dict, path: str = "") -> None:
+    for key, value in current.items():
+        name = f"{path}{key}"
+        if isinstance(value, dict):
+            compare(previous.get(key, {}), value, f"{name}.")
+        elif key.endswith("per_second") and previous.get(key):
+            change = (value - previous[key]) / previous[key] * 100
+            print(f"{name:<48} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark parsing, extraction, cleaning and plotting offline"
+    )
+    parser.add_argument(
+        "--vacancies", type=int, default=10_000,
+        help="synthetic vacancies for parsing and cleaning (scales to 100k)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-analysis", action="store_true")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    parser.add_argument("--no-history", action="store_true")
+    args = parser.parse_args()
+
+    print(f"Generating {args.vacancies} synthetic vacancies")
+    vacancies = synthetic_vacancies(args.vacancies)
+    pages = {vacancy["url"]: vacancy_page(vacancy) for vacancy in vacancies}
+    descriptions = [" ".join(vacancy["description"]) for vacancy in vacancies]
+
+    results = {
+        "fixture_parsing": bench_parsing(fixture_pages(), max(args.repeat, 20)),
+        "synthetic_parsing": bench_parsing(pages, args.repeat),
+        "extractors": bench_extractors(descriptions, args.repeat),
+    }
+    if not args.skip_analysis:
+        results["analysis"] = bench_analysis(args.vacancies, args.repeat)
+
+    if args.no_history:
+        return
+
+    history = json.loads(args.history.read_text(encoding="utf-8")) if args.history.exists() else []
+    comparable = [
+        run for run in history
+        if run["vacancies"] == args.vacancies and run["python"] == platform.python_version()
+    ]
+    if comparable:
+        print(f"\nChange against {comparable[-1]['revision']} ({comparable[-1]['timestamp']}):")
+        compare(comparable[-1]["results"], results)
+
+    history.append({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "vacancies": args.vacancies,
+        "results": results,
+    })
+    args.history.write_text(json.dumps(history, indent=1), encoding="utf-8")
+    print(f"Appended results to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import random
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import MainConfig
+from src.scrape.extractors import extract_vacancy_fields
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+MONTHS = [
+    "січня", "лютого", "березня", "квітня", "травня", "червня",
+    "липня", "серпня", "вересня", "жовтня", "листопада", "грудня",
+]
+TITLES = [
+    "Junior Python Developer", "Middle Python Developer", "Senior Python Engineer",
+    "Python розробник", "Backend Developer (Python)", "Data Engineer", "Tech Lead (Python)",
+]
+REQUIREMENTS = [
+    "{n}+ years of commercial experience with {tech}",
+    "Досвід роботи з {tech} від {n} років",
+    "At least {n} years with {tech} and {tech2}",
+    "{m} months of experience with {tech}",
+    "Strong knowledge of {tech}, {tech2} and {tech3}",
+    "Знання {tech} та {tech2}",
+    "Experience with {tech} in production",
+    "Буде плюсом: {tech}, {m} міс. з {tech2}",
+]
+ABOUT = [
+    "We are a product company founded in {year}. Our team has {n}0 engineers.",
+    "Ми — команда, яка вже {n} років створює продукти для {n}00 клієнтів.",
+    "Our platform serves {n} million users in {n}0 countries.",
+]
+OFFER = [
+    "We offer {n}0 days of paid vacation and medical insurance.",
+    "Start date: 0{n}.0{n}.2026, interview in {n} stages.",
+    "Ми пропонуємо гнучкий графік та компенсацію навчання.",
+]
+
+
+def _salary(rng: random.Random) -> str | None:
+    low = rng.randrange(500, 7000, 100)
+    kind = rng.random()
+    if kind < 0.45:
+        return None
+    if kind < 0.75:
+        return f"${low}–{low + rng.randrange(500, 3000, 100)}"
+    if kind < 0.85:
+        return f"від ${low}"
+    if kind < 0.95:
+        return f"до ${low}"
+    return f"${low}"
+
+
+def _description(rng: random.Random, keywords: list[str]) -> list[str]:
+    def fill(template: str) -> str:
+        techs = rng.sample(keywords, 3)
+        return template.format(
+            n=rng.randint(1, 9), m=rng.randint(3, 11), year=rng.randint(2000, 2022),
+            tech=techs[0], tech2=techs[1], tech3=techs[2],
+        )
+
+    return [
+        fill(rng.choice(ABOUT)),
+        *(fill(rng.choice(REQUIREMENTS)) + ";" for _ in range(rng.randint(4, 9))),
+        fill(rng.choice(OFFER)),
+    ]
+
+
+def synthetic_vacancy(i: int, rng: random.Random) -> dict:
+    keywords = sorted(MainConfig.TECH_KEYWORDS | set(MainConfig.TECH_ALIASES))
+    cities = list(MainConfig.LOCATION_TRANSLATIONS)
+
+    return {
+        "name": rng.choice(TITLES),
+        "company_name": f"Company {i % 997}",
+        "company_url": f"https://jobs.dou.ua/companies/company-{i % 997}/",
+        "url": f"https://jobs.dou.ua/companies/company-{i % 997}/vacancies/{100000 + i}/",
+        "salary": _salary(rng),
+        "date": f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.choice([2025, 2026])}",
+        "location": ", ".join(rng.sample(cities, rng.choice([1, 1, 1, 2, 3]))),
+        "description": _description(rng, keywords),
+    }
+
+
+def synthetic_vacancies(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [synthetic_vacancy(i, rng) for i in range(count)]
+
+
+def vacancy_page(vacancy: dict) -> str:
+    salary = f'<span class="salary">{vacancy["salary"]}</span>' if vacancy["salary"] else ""
+    paragraphs = "\n".join(f"<p>{line}</p>" for line in vacancy["description"])
+
+    return f'''<!DOCTYPE html>
+<html lang="uk"><head><meta charset="utf-8"><title>{vacancy["name"]} | DOU</title></head>
+<body>
+<div class="l-content m-content">
+<div class="b-compinfo"><div class="info"><div class="l-n">
+<a href="{vacancy["company_url"]}">{vacancy["company_name"]}</a>
+</div></div></div>
+<div class="b-vacancy">
+<h1 class="g-h2">{vacancy["name"]}</h1>
+<div class="date">{vacancy["date"]}</div>
+<div class="sh-info">{salary}<span class="place">{vacancy["location"]}</span></div>
+<div class="b-typo vacancy-section">
+{paragraphs}
+</div>
+</div>
+</div>
+</body></html>
+'''
+
+
+def fixture_pages() -> dict[str, str]:
+    return {
+        f"https://jobs.dou.ua/companies/fixture/vacancies/{path.stem}/": path.read_text(encoding="utf-8")
+        for path in sorted(FIXTURES_DIR.glob("*.html"))
+    }
+
+
+def raw_snapshot_frame(count: int, seed: int = 0) -> pd.DataFrame:
+    # rows the way the feed exporter writes them
+    rows = []
+    for vacancy in synthetic_vacancies(count, seed):
+        description, experience, techs = extract_vacancy_fields(vacancy["description"])
+        rows.append({
+            **vacancy,
+            "description": description,
+            "experience_years": experience,
+            "technologies": ",".join(techs) or None,
+        })
+
+    return pd.DataFrame(rows, columns=MainConfig.CRAWLER_SETTINGS["FEED_EXPORT_FIELDS"])
@@ -0,0 +1,42 @@
+import argparse
+import re
+from pathlib import Path
+
+from benchmarks.common import best_time, load_descriptions, report
+from src.config import MainConfig
+from src.scrape.extractors import extract_tech_stack
+
+
+def legacy_extract_tech_stack(text: str) -> list[str]:
+    text_tokens = set(re.findall(r"\b[\w.+#]+\b", text.lower()))
+    found_tech = MainConfig.TECH_KEYWORDS.intersection(text_tokens)
+
+    return list(found_tech)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare technology matchers")
+    parser.add_argument("--data-dir", type=Path, default=MainConfig.DATA_DIR)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.data_dir, limit=args.limit)
+    print(f"Corpus: {len(descriptions)} descriptions")
+
+    for name, extractor in (
+        ("legacy token set", legacy_extract_tech_stack),
+        ("compiled trie regex", extract_tech_stack),
+    ):
+        seconds = best_time(lambda: [extractor(d) for d in descriptions], args.repeat)
+        report(name, seconds, len(descriptions), "descriptions")
+
+    changed = sum(
+        set(legacy_extract_tech_stack(d)) != set(extract_tech_stack(d))
+        for d in descriptions
+    )
+    print(f"Descriptions with a different tech set (aliases, multi-word): {changed}")
+
+
+if __name__ == "__main__":
+    main()
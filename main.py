@@ -1,15 +1,327 @@
-from src.analysis.data_processing_orchestrator import data_orchestrator
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.config import MainConfig
+from src.instrumentation import PROFILERS, profiled
 from src.logging_config import setup_logging
-from src.crawler import run_spider, get_csv_output_path
 
+# Scrapy, pandas and matplotlib are imported by the commands that need them,
+# so --help and list-snapshots start in a fraction of the time
 
-def main(field: str):
-    setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def resolve_snapshot(snapshot: str) -> Path:
+    snapshot_dir = Path(snapshot)
+    if not snapshot_dir.exists():
+        snapshot_dir = MainConfig.DATA_DIR / snapshot
+
+    if not (snapshot_dir / MainConfig.CSV_NAME).exists():
+        raise SystemExit(f"Snapshot {snapshot} not found")
+
+    return snapshot_dir.resolve()
+
+
+def analysis_kwargs(args: argparse.Namespace, concurrent_analyses: int = 1) -> dict:
+    return {
+        "plot_format": args.plot_format,
+        "plot_dpi": args.dpi,
+        # analyses running side by side split the plot workers between them
+        "plot_workers": max(1, MainConfig.PLOT_WORKERS // concurrent_analyses),
+        "skip_unchanged_plots": not getattr(args, "force_plots", False),
+        "translate_locations": not args.no_translate,
+        "deduplicate": not getattr(args, "keep_duplicates", False),
+        "profile": args.profile,
+        "prometheus": args.prometheus,
+    }
+
+
+def analyze_snapshot(csv_path: Path, **kwargs) -> None:
+    from src.analysis.data_processing_orchestrator import data_orchestrator
+
+    data_orchestrator(csv_path, **kwargs)
+
+
+def crawl_settings(args: argparse.Namespace) -> dict:
+    return {
+        "METRICS_PROMETHEUS_ENABLED": args.prometheus,
+        "FEED_ARCHIVE": args.archive,
+    }
+
+
+def crawl_fields(args: argparse.Namespace, on_feed_closed=None) -> dict[str, Path]:
+    from src.crawler import get_snapshot_id, run_spiders
+
+    fields, incremental, replay_snapshot, resume_snapshot = args.fields, not args.full, None, None
+    if args.resume:
+        snapshot_dir = resolve_snapshot(args.resume)
+        resume_snapshot = snapshot_dir / MainConfig.CSV_NAME
+        fields = [snapshot_dir.parent.name]
+        logger.info(f"Resuming the interrupted crawl in {snapshot_dir}")
+    elif args.replay:
+        snapshot_dir = resolve_snapshot(args.replay)
+        replay_snapshot = get_snapshot_id(snapshot_dir / MainConfig.CSV_NAME)
+        fields = [snapshot_dir.parent.name]
+        incremental = False
+        logger.info(f"Replaying snapshot {replay_snapshot} from the HTTP cache")
+
+    profile_path = MainConfig.LOGS_DIR / (
+        f"crawl_{datetime.now().strftime(MainConfig.SNAPSHOT_TIME_FORMAT)}.prof"
+    )
+    with profiled(profile_path, args.profile):
+        return run_spiders(
+            fields,
+            incremental=incremental,
+            on_feed_closed=on_feed_closed,
+            replay_snapshot=replay_snapshot,
+            resume_snapshot=resume_snapshot,
+            extra_settings=crawl_settings(args),
+        )
+
+
+def crawl_command(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    output_paths = crawl_fields(args)
+
+    for field, output_path in output_paths.items():
+        logger.info(f"Saved {field} snapshot to {output_path.parent}")
+    logger.info(f"Crawl finished after {time.perf_counter() - started:.1f}s")
+
+
+def analyze_command(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    snapshot_dir = resolve_snapshot(args.snapshot)
+
+    analyze_snapshot(snapshot_dir / MainConfig.CSV_NAME, **analysis_kwargs(args))
+    logger.info(f"Analysis of {snapshot_dir} finished after {time.perf_counter() - started:.1f}s")
+
+
+def run_command(args: argparse.Namespace) -> None:
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    started = time.perf_counter()
+
+    # spawn keeps the Twisted reactor threads out of the analysis workers
+    with ProcessPoolExecutor(
+        mp_context=get_context("spawn"), initializer=setup_logging
+    ) as executor:
+        analyses: dict[str, Future] = {}
+
+        def start_analysis(field: str, output_path: Path) -> None:
+            logger.info(f"Feed for {field} closed. Starting analysis of {output_path}")
+            analyses[field] = executor.submit(
+                analyze_snapshot, output_path, **analysis_kwargs(args, len(args.fields))
+            )
+
+        crawl_fields(args, on_feed_closed=start_analysis)
+        logger.info(f"Crawl finished after {time.perf_counter() - started:.1f}s")
 
-    output_path = get_csv_output_path(field)
-    run_spider(field, output_path)
-    data_orchestrator(output_path)
+        for field, analysis in analyses.items():
+            try:
+                analysis.result()
+            except Exception:
+                logger.exception(f"Analysis for {field} failed")
+
+    logger.info(f"Run finished after {time.perf_counter() - started:.1f}s")
+
+
+def daemon_command(args: argparse.Namespace) -> None:
+    from src.daemon import run_daemon
+
+    schedules = {}
+    for schedule in args.schedules or []:
+        field, _, spec = schedule.rpartition("=")
+        if field and field not in MainConfig.CATEGORIES:
+            raise SystemExit(f"Unknown field {field!r} in --schedule {schedule!r}")
+        for scheduled_field in [field] if field else args.fields:
+            schedules[scheduled_field] = spec
+
+    run_daemon(
+        args.fields,
+        analyze_snapshot,
+        analysis_kwargs(args, MainConfig.DAEMON_ANALYSIS_WORKERS),
+        schedules=schedules,
+        incremental=not args.full,
+        extra_settings=crawl_settings(args),
+        jitter=args.jitter,
+        port=args.port,
+        run_now=args.now,
+    )
+
+
+def list_snapshots_command(args: argparse.Namespace) -> None:
+    fields = args.fields or sorted(
+        path.name for path in MainConfig.DATA_DIR.glob("*") if path.is_dir()
+    )
+
+    for field in fields:
+        for snapshot_dir in sorted((MainConfig.DATA_DIR / field).glob("*")):
+            csv_path = snapshot_dir / MainConfig.CSV_NAME
+            if not csv_path.exists():
+                continue
+
+            aggregates_path = snapshot_dir / MainConfig.AGGREGATES_NAME
+            vacancies = (
+                json.loads(aggregates_path.read_text(encoding="utf-8"))["vacancies"]
+                if aggregates_path.exists()
+                else "-"
+            )
+            analyzed = (snapshot_dir / MainConfig.CLEAN_PARQUET_NAME).exists()
+
+            print(
+                f"{field}/{snapshot_dir.name}  {vacancies:>6}  "
+                f"{csv_path.stat().st_size / 2 ** 20:8.2f} MiB  "
+                f"{'analyzed' if analyzed else 'raw'}"
+            )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    fields = argparse.ArgumentParser(add_help=False)
+    fields.add_argument(
+        "--field",
+        dest="fields",
+        action="append",
+        choices=sorted(MainConfig.CATEGORIES),
+        help="category to crawl, may be repeated (default: python)",
+    )
+
+    feeds = argparse.ArgumentParser(add_help=False)
+    feeds.add_argument(
+        "--full",
+        action="store_true",
+        help="re-download every vacancy instead of carrying over unchanged ones",
+    )
+    feeds.add_argument(
+        "--archive",
+        choices=MainConfig.FEED_ARCHIVES,
+        help="also write a compressed JSONL or CSV copy of the feed",
+    )
+
+    crawling = argparse.ArgumentParser(add_help=False)
+    crawling.add_argument(
+        "--replay",
+        metavar="SNAPSHOT",
+        help="re-run a previous snapshot (e.g. python/2026-02-19_18-28-09) "
+        "entirely from the HTTP cache",
+    )
+    crawling.add_argument(
+        "--resume",
+        metavar="SNAPSHOT",
+        help="finish an interrupted crawl, fetching only the vacancies missing from its feed",
+    )
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--plot-format", choices=MainConfig.PLOT_FORMATS, default=MainConfig.PLOT_FORMAT)
+    output.add_argument("--dpi", type=int, default=MainConfig.PLOT_DPI)
+    output.add_argument(
+        "--no-translate",
+        action="store_true",
+        help="keep location names as scraped instead of translating them to English",
+    )
+
+    reporting = argparse.ArgumentParser(add_help=False)
+    reporting.add_argument(
+        "--profile",
+        choices=PROFILERS,
+        help="profile the crawl and each analysis (dumps next to the logs and in the run dirs)",
+    )
+    reporting.add_argument(
+        "--prometheus",
+        action="store_true",
+        help="also write the run metrics as Prometheus text files",
+    )
+
+    analysis = argparse.ArgumentParser(add_help=False)
+    analysis.add_argument(
+        "--force-plots",
+        action="store_true",
+        help="redraw plots whose data has not changed since the last render",
+    )
+    analysis.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="count reposts of the same vacancy separately",
+    )
+
+    parser = argparse.ArgumentParser(description="Scrape and analyze DOU vacancies")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    crawl = commands.add_parser(
+        "crawl",
+        parents=[fields, feeds, crawling, reporting],
+        help="scrape new snapshots without analyzing them",
+    )
+    crawl.set_defaults(handler=crawl_command)
+
+    analyze = commands.add_parser(
+        "analyze", parents=[output, reporting, analysis], help="clean a stored snapshot and draw its plots"
+    )
+    analyze.add_argument("snapshot", help="snapshot dir or id, e.g. python/2026-02-19_18-28-09")
+    analyze.set_defaults(handler=analyze_command)
+
+    run = commands.add_parser(
+        "run",
+        parents=[fields, feeds, crawling, output, reporting, analysis],
+        help="crawl and analyze each snapshot as soon as its feed closes (default)",
+    )
+    run.set_defaults(handler=run_command)
+
+    daemon = commands.add_parser(
+        "daemon",
+        parents=[fields, feeds, output, reporting, analysis],
+        help="keep running, crawling and analyzing each field on a schedule",
+    )
+    daemon.add_argument(
+        "--schedule",
+        dest="schedules",
+        action="append",
+        metavar="[FIELD=]CRON",
+        help=f"cron spec of the crawls, for one field or all (default: {MainConfig.DAEMON_SCHEDULE!r})",
+    )
+    daemon.add_argument(
+        "--jitter",
+        type=float,
+        default=MainConfig.DAEMON_JITTER,
+        help="start each crawl up to this many seconds after its scheduled time",
+    )
+    daemon.add_argument(
+        "--port",
+        type=int,
+        default=MainConfig.DAEMON_STATUS_PORT,
+        help="local port of the /status and /health endpoints",
+    )
+    daemon.add_argument(
+        "--now", action="store_true", help="crawl every field once on start-up too"
+    )
+    daemon.set_defaults(handler=daemon_command)
+
+    list_snapshots = commands.add_parser(
+        "list-snapshots", parents=[fields], help="list stored snapshots"
+    )
+    list_snapshots.set_defaults(handler=list_snapshots_command)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    # the options of the old single-command CLI still mean "run"
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["run", *argv]
+
+    args = build_parser().parse_args(argv)
+    if args.command in ("crawl", "run", "daemon") and not args.fields:
+        args.fields = ["python"]
+
+    setup_logging()
+    args.handler(args)
 
 
 if __name__ == "__main__":
-    main("python")
+    main()
@@ -0,0 +1,123 @@
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from src.analysis.normalization import (
+    DAYS_ORDER,
+    SALARY_CURRENCY,
+    SALARY_LABELS,
+    parse_date,
+    parse_salary,
+    salary_range,
+)
+from src.analysis.translation import LocationTranslator
+from src.storage import to_float
+
+logger = logging.getLogger(__name__)
+
+
+def _split(value, sep: str) -> list[str]:
+    if isinstance(value, str):
+        value = value.split(sep)
+
+    return [term.strip() for term in value or [] if term and term.strip()]
+
+
+class RunningAggregates:
+    # Counters behind every plot, updated one vacancy at a time, so memory
+    # grows with the number of distinct values rather than with rows. They
+    # include the reposts the analysis drops as duplicates, so the analysis
+    # draws the plots from its own cleaned data
+
+    def __init__(self):
+        self.vacancies = 0
+        self.technologies = Counter()
+        self.locations = Counter()
+        self.experience = Counter()
+        self.dates = Counter()
+        self.weekdays = Counter()
+        self.lower_salary_ranges = Counter()
+        self.upper_salary_ranges = Counter()
+
+    def update(self, item) -> None:
+        # items carried over from the previous snapshot hold CSV strings
+        self.vacancies += 1
+
+        self.technologies.update(set(_split(item.get("technologies"), ",")))
+        self.locations.update(set(_split(item.get("location"), ", ")) or {"unknown"})
+
+        experience = to_float(item.get("experience_years"))
+        if experience is not None and experience == experience:
+            self.experience[experience] += 1
+
+        date = parse_date(item.get("date"))
+        if date is not None:
+            self.dates[date] += 1
+            self.weekdays[date.day_name()] += 1
+
+        lower, upper, currency = parse_salary(item.get("salary"))
+        if currency not in (None, SALARY_CURRENCY):
+            return
+
+        for counter, value, right in (
+            (self.lower_salary_ranges, lower, False),
+            (self.upper_salary_ranges, upper, True),
+        ):
+            label = salary_range(value, right)
+            if label is not None:
+                counter[label] += 1
+
+    def plot_payloads(self, translate_locations: bool = True) -> dict:
+        # the same payloads the aggregations in plots.py compute from the clean
+        # frame (whose dummy columns are sorted, hence the sort before nlargest)
+        locations = self.locations
+        if translate_locations:
+            translated = LocationTranslator().translate_locations(
+                loc for loc in locations if loc != "unknown"
+            )
+            locations = Counter()
+            for loc, count in self.locations.items():
+                for part in translated.get(loc, loc).split(", "):
+                    locations[part] += count
+
+        salary_index = pd.CategoricalIndex(SALARY_LABELS, categories=SALARY_LABELS, ordered=True)
+
+        return {
+            "experience_bar": self._counts(self.experience, "experience_years").sort_index(),
+            "publishing_date_bar": self._counts(self.dates, "date").sort_index(),
+            "publishing_day_bar": self._counts(self.weekdays, "date").reindex(DAYS_ORDER),
+            "work_location_pie": (
+                pd.Series(locations, dtype="int64").sort_index().nlargest(10),
+                self.vacancies,
+            ),
+            "salary_comparison_bar": pd.DataFrame({
+                "lower": [self.lower_salary_ranges[label] for label in SALARY_LABELS],
+                "upper": [self.upper_salary_ranges[label] for label in SALARY_LABELS],
+            }, index=salary_index),
+            "technologies_bar": pd.Series(self.technologies, dtype="int64").sort_index().nlargest(20),
+        }
+
+    @staticmethod
+    def _counts(counter: Counter, index_name: str) -> pd.Series:
+        counts = pd.Series(counter, dtype="int64", name="count")
+        counts.index.name = index_name
+
+        return counts
+
+    def save(self, path: Path) -> None:
+        data = {
+            "vacancies": self.vacancies,
+            "technologies": dict(self.technologies.most_common()),
+            "locations": dict(self.locations.most_common()),
+            "experience": {str(k): v for k, v in sorted(self.experience.items())},
+            "dates": {str(k.date()): v for k, v in sorted(self.dates.items())},
+            "weekdays": {day: self.weekdays[day] for day in DAYS_ORDER},
+            "lower_salary_ranges": {label: self.lower_salary_ranges[label] for label in SALARY_LABELS},
+            "upper_salary_ranges": {label: self.upper_salary_ranges[label] for label in SALARY_LABELS},
+        }
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+
+        logger.info(f"Saved aggregates of {self.vacancies} vacancies to {path}")
@@ -0,0 +1,239 @@
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.config import MainConfig
+from src.storage import save_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Every vacancy has one value of these, so their counts can be summed
+KEY_DIMENSIONS = [
+    "date",
+    "weekday",
+    "month",
+    "experience_years",
+    "lower_salary_range",
+    "upper_salary_range",
+]
+# A vacancy mentions several technologies and locations, so a query never
+# sums over them: it reads a grouping set where they are rolled up instead
+MULTI_DIMENSIONS = {"technology": "tech_", "location": "loc_"}
+DIMENSIONS = KEY_DIMENSIONS + list(MULTI_DIMENSIONS)
+
+# The grouping sets stored in the cube. The single dimension sets answer
+# the plots in a few dozen cells. The combined ones key on the month rather
+# than the exact date, so the cube stays a small fraction of the rows
+SALARY_RANGES = ("lower_salary_range", "upper_salary_range")
+GROUPING_SETS = [
+    (),
+    *((dimension,) for dimension in DIMENSIONS),
+    ("technology", "location"),
+    ("month", "technology"),
+    ("month", "location"),
+    ("month", "experience_years", *SALARY_RANGES),
+    ("experience_years", *SALARY_RANGES, "technology"),
+    ("experience_years", *SALARY_RANGES, "location"),
+    ("experience_years", "technology", "location"),
+]
+
+
+def grouping_id(dimensions: Iterable[str]) -> int:
+    # like SQL GROUPING_ID(): a bit for every dimension rolled up, whose
+    # column is null in the cells of that grouping set
+    dimensions = set(dimensions)
+    return sum(1 << i for i, dimension in enumerate(DIMENSIONS) if dimension not in dimensions)
+
+
+def _memberships(df: pd.DataFrame, prefix: str, dimension: str) -> pd.DataFrame:
+    # (row position, term) for every set dummy column, sparse or dense
+    rows, terms = [], []
+    for column in df.columns:
+        if not column.startswith(prefix):
+            continue
+
+        values = df[column]
+        if isinstance(values.dtype, pd.SparseDtype):
+            positions = values.array.sp_index.indices[values.array.sp_values != 0]
+        else:
+            positions = np.flatnonzero(values.to_numpy())
+
+        rows.append(positions)
+        terms.append(np.full(len(positions), column.removeprefix(prefix), dtype=object))
+
+    return pd.DataFrame({
+        "row": np.concatenate(rows) if rows else np.empty(0, dtype=np.int64),
+        dimension: np.concatenate(terms) if terms else np.empty(0, dtype=object),
+    })
+
+
+def _expand(facts: pd.DataFrame, members: pd.DataFrame) -> pd.DataFrame:
+    expanded = facts.take(members["row"].to_numpy()).reset_index(drop=True)
+    for column in members.columns.drop("row"):
+        expanded[column] = members[column].to_numpy()
+
+    return expanded
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    # Vacancy counts of the clean frame for every grouping set
+    facts = pd.DataFrame({
+        "date": df["date"].to_numpy(),
+        "weekday": df["date"].dt.day_name().to_numpy(),
+        "month": df["date"].dt.to_period("M").dt.start_time.to_numpy(),
+        "experience_years": df["experience_years"].to_numpy(),
+        "lower_salary_range": df["lower_salary_range"].reset_index(drop=True),
+        "upper_salary_range": df["upper_salary_range"].reset_index(drop=True),
+    })
+    techs = _memberships(df, "tech_", "technology")
+    locations = _memberships(df, "loc_", "location")
+
+    sources = {
+        (False, False): facts,
+        (True, False): _expand(facts, techs),
+        (False, True): _expand(facts, locations),
+        (True, True): _expand(facts, techs.merge(locations, on="row")),
+    }
+    empty = sources[(True, True)].iloc[:0]
+
+    cells = []
+    for dimensions in GROUPING_SETS:
+        rows = sources[("technology" in dimensions, "location" in dimensions)]
+        if dimensions:
+            counts = rows.groupby(list(dimensions), dropna=False, observed=True).size()
+            counts = counts.rename("vacancies").reset_index()
+        else:
+            counts = pd.DataFrame({"vacancies": [len(rows)]})
+
+        # rolled up columns are nulls of the column's own dtype
+        for dimension in DIMENSIONS:
+            if dimension not in dimensions:
+                counts[dimension] = empty[dimension].reindex(counts.index)
+
+        counts["grouping"] = np.int16(grouping_id(dimensions))
+        cells.append(counts[[*DIMENSIONS, "vacancies", "grouping"]])
+
+    cube = pd.concat(cells, ignore_index=True)
+    # a few distinct values each, filtered and grouped on by code
+    cube = cube.astype({"weekday": "category", "technology": "category", "location": "category"})
+
+    logger.info(f"Built a cube of {len(cube)} cells from {len(df)} vacancies")
+    return cube
+
+
+def save_cube(cube: pd.DataFrame, run_dir: Path) -> Path:
+    return save_snapshot(cube, run_dir / MainConfig.CUBE_NAME)
+
+
+def _is_current(cube_path: Path) -> bool:
+    # grouping ids are bits of DIMENSIONS, so a cube with other dimensions
+    # means other grouping sets by the same ids
+    return (
+        cube_path.exists()
+        and pq.read_schema(cube_path).names == [*DIMENSIONS, "vacancies", "grouping"]
+    )
+
+
+def load_cube(run_dir: Path) -> pd.DataFrame:
+    run_dir = Path(run_dir)
+    if not _is_current(run_dir / MainConfig.CUBE_NAME):
+        logger.info(f"Rebuilding the outdated cube of {run_dir}")
+        cube = build_cube(pd.read_parquet(run_dir / MainConfig.CLEAN_PARQUET_NAME))
+        save_cube(cube, run_dir)
+        return cube
+
+    return pd.read_parquet(run_dir / MainConfig.CUBE_NAME)
+
+
+def load_cubes(snapshot_dirs: Iterable[Path]) -> pd.DataFrame:
+    # one frame with a "snapshot" column, e.g. for query_cube(cubes, by="snapshot")
+    cubes = [
+        load_cube(snapshot_dir).assign(snapshot=Path(snapshot_dir).name)
+        for snapshot_dir in snapshot_dirs
+        if (Path(snapshot_dir) / MainConfig.CUBE_NAME).exists()
+    ]
+    if not cubes:
+        raise FileNotFoundError("None of the snapshots has a cube")
+
+    return pd.concat(cubes, ignore_index=True)
+
+
+def _grouping_set(dimensions: set[str]) -> tuple[str, ...]:
+    # the smallest stored set with every dimension asked for, where the
+    # technologies and locations that are not asked for are rolled up
+    candidates = [
+        grouping_set
+        for grouping_set in GROUPING_SETS
+        if dimensions <= set(grouping_set)
+        and not (set(grouping_set) & set(MULTI_DIMENSIONS)) - dimensions
+    ]
+    if not candidates:
+        raise ValueError(
+            f"The cube has no grouping set with {sorted(dimensions)}, "
+            f"combine the month rather than the date or weekday with other dimensions"
+        )
+
+    return min(candidates, key=len)
+
+
+def query_cube(cube: pd.DataFrame, by: str | list[str] | None = None, **filters):
+    # Vacancies matching the filters, in total or per value of `by`. A filter
+    # is a value, a collection of values or a predicate on the column, e.g.
+    # query_cube(cube, technology="django", location="Kyiv",
+    #            experience_years=lambda years: years >= 3)
+    by = [by] if isinstance(by, str) else list(by or [])
+    for dimension in [*by, *filters]:
+        if dimension not in cube.columns or dimension in ("vacancies", "grouping"):
+            raise ValueError(f"Unknown cube dimension {dimension!r}")
+
+    for dimension in MULTI_DIMENSIONS:
+        if dimension in filters and not isinstance(filters[dimension], str):
+            raise ValueError(f"{dimension} takes a single value, a vacancy can match several")
+
+    # columns outside the cube's dimensions, like load_cubes' snapshot, are in every cell
+    grouping_set = _grouping_set({*by, *filters} & set(DIMENSIONS))
+    columns = list(dict.fromkeys([*by, *filters, "vacancies"]))
+    cells = cube.loc[cube["grouping"].to_numpy() == grouping_id(grouping_set), columns]
+
+    if filters:
+        mask = np.ones(len(cells), dtype=bool)
+        for dimension, condition in filters.items():
+            column = cells[dimension]
+            if callable(condition):
+                matched = condition(column)
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                matched = column.isin(condition)
+            else:
+                matched = column == condition
+            mask &= matched.fillna(False).to_numpy(dtype=bool)
+        cells = cells[mask]
+
+    if not by:
+        return int(cells["vacancies"].sum())
+
+    return cells.groupby(by, observed=True)["vacancies"].sum()
+
+
+def build_missing_cubes(data_dir: Path | None = None) -> int:
+    data_dir = Path(data_dir or MainConfig.DATA_DIR)
+    built = 0
+
+    for clean_path in sorted(data_dir.glob(f"*/*/{MainConfig.CLEAN_PARQUET_NAME}")):
+        if _is_current(clean_path.parent / MainConfig.CUBE_NAME):
+            continue
+
+        save_cube(build_cube(pd.read_parquet(clean_path)), clean_path.parent)
+        built += 1
+
+    return built
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+
+    setup_logging()
+    logger.info(f"Built cubes of {build_missing_cubes()} analyzed snapshots")
@@ -1,84 +1,90 @@
 import logging
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
-from deep_translator import GoogleTranslator
 
+from src.analysis.dedup import near_duplicates
+from src.analysis.encoding import sparse_dummies
+from src.analysis.normalization import (
+    SALARY_BINS,
+    SALARY_LABELS,
+    in_salary_currency,
+    parse_dates,
+    parse_salaries,
+)
+from src.analysis.translation import LocationTranslator
+from src.config import MainConfig
+from src.instrumentation import incr, timer
+from src.scrape.extractors import extract_experience
+from src.storage import load_snapshot
 
 logger = logging.getLogger(__name__)
 
 
-def clean_data(csv_path: Path, translate_locations: bool = True) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+def extract_experience_batch(descriptions: pd.Series) -> pd.Series:
+    return descriptions.fillna("").map(extract_experience).astype(float)
 
-    logger.info("Starting data cleaning...")
-
-    SALARY_PATTERN = "(\\d+)\\D*(\\d+)?"
-    salary_nums = df["salary"].str.extract(SALARY_PATTERN).astype(float)
 
-    df["lower_salary"] = salary_nums[0]
-    df["upper_salary"] = salary_nums[1]
+CLEAN_INPUT_COLUMNS = ["salary", "experience_years", "date", "location", "technologies"]
 
-    is_to = df["salary"].str.startswith("до", na=False)
-    is_from = df["salary"].str.startswith("від", na=False)
 
-    df.loc[is_to, "upper_salary"] = df.loc[is_to, "lower_salary"]
-    df.loc[is_to, "lower_salary"] = np.nan
-    df.loc[is_from, "upper_salary"] = np.nan
+def clean_data(
+    snapshot_path: Path, translate_locations: bool = True, deduplicate: bool = True
+) -> pd.DataFrame:
+    columns = CLEAN_INPUT_COLUMNS + (["url", "description"] if deduplicate else [])
+    df = load_snapshot(snapshot_path, columns=columns)
+    df["location"] = df["location"].astype(object)
+    df["technologies"] = df["technologies"].astype(object)
 
-    for col in ["lower_salary", "upper_salary"]:
-        df.loc[df[col] <= 10, col] *= 1000
-        df.loc[df[col] <= 100, col] *= 100
+    logger.info("Starting data cleaning...")
 
-    ukr_months = {
-        "січня": "01", "лютого": "02", "березня": "03", "квітня": "04",
-        "травня": "05", "червня": "06", "липня": "07", "серпня": "08",
-        "вересня": "09", "жовтня": "10", "листопада": "11", "грудня": "12"
-    }
-    df["date"] = df["date"].replace(ukr_months, regex=True)
+    if deduplicate:
+        # reposts of one vacancy would count its techs and salary several times
+        with timer("dedup"):
+            duplicated = near_duplicates(df["url"], df["description"])
+        incr("near_duplicates", int(duplicated.sum()))
+        logger.info(f"Dropping {duplicated.sum()} near-duplicate vacancies")
+        df = df[~duplicated.to_numpy()].drop(columns="description").reset_index(drop=True)
 
-    df["date"] = pd.to_datetime(df["date"], format="%d %m %Y")
+    df = df.join(parse_salaries(df["salary"]))
+    df["date"] = parse_dates(df["date"])
 
     if translate_locations:
         logger.info("Translating locations to English...")
 
         unique_locs = df["location"].dropna().unique()
-        translator = GoogleTranslator(source="uk", target="en")
-        trans_map = {loc: translator.translate(loc) for loc in unique_locs}
+        with timer("translate"):
+            trans_map = LocationTranslator().translate_locations(unique_locs)
         df["location"] = df["location"].map(trans_map)
 
     df["location"] = df["location"].fillna("unknown")
 
-    loc_dummies = df["location"].str.get_dummies(sep=", ").add_prefix("loc_")
-    tech_dummies = df["technologies"].str.get_dummies(sep=",").add_prefix("tech_")
+    loc_dummies = sparse_dummies(df["location"], sep=", ", prefix="loc_")
+    tech_dummies = sparse_dummies(
+        df["technologies"], sep=",", prefix="tech_", vocabulary=MainConfig.TECH_KEYWORDS
+    )
 
     df = pd.concat([df, tech_dummies, loc_dummies], axis=1)
 
-    bins = [0, 500, 1000, 1500, 2000, 3000, 4000, 5000, 7000, np.inf]
-
-    labels = [
-        "0-500", "500-1000", "1000-1500", "1500-2000",
-        "2000-3000", "3000-4000", "4000-5000", "5000-7000", "7000+"
-    ]
+    in_bins = in_salary_currency(df["salary_currency"])
 
     df["lower_salary_range"] = pd.cut(
-        df["lower_salary"],
-        bins=bins,
-        labels=labels,
+        df["lower_salary"].where(in_bins),
+        bins=SALARY_BINS,
+        labels=SALARY_LABELS,
         right=False
     )
 
     df["upper_salary_range"] = pd.cut(
-        df["upper_salary"],
-        bins=bins,
-        labels=labels,
+        df["upper_salary"].where(in_bins),
+        bins=SALARY_BINS,
+        labels=SALARY_LABELS,
         right=True
     )
 
     cols_to_remove = [
         "name", "company_name", "salary", "location", "technologies",
-        "url", "company_url", "description", "lower_salary", "upper_salary"
+        "url", "company_url", "description"
     ]
     df.drop(columns=[c for c in cols_to_remove if c in df.columns], inplace=True)
 
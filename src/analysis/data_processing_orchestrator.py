@@ -1,24 +1,58 @@
 from pathlib import Path
 
-from src.analysis.plots import (
-    experience_bar,
-    publishing_date_bar,
-    publishing_day_bar,
-    work_location_pie,
-    salary_comparison_bar,
-    technologies_bar
-)
+from src.analysis.cube import build_cube, save_cube
 from src.analysis.data_cleaning import clean_data
+from src.analysis.encoding import densify
+from src.analysis.rendering import render_plots
+from src.analysis.warehouse import ingest_snapshot
+from src.config import MainConfig
+from src.instrumentation import METRICS, profiled, timer, write_metrics, write_prometheus
+from src.storage import save_snapshot
 
 
-def data_orchestrator(csv_path: Path):
-    df = clean_data(csv_path, translate_locations=True)
+def data_orchestrator(
+    csv_path: Path,
+    plot_format: str = MainConfig.PLOT_FORMAT,
+    plot_dpi: int = MainConfig.PLOT_DPI,
+    plot_workers: int = MainConfig.PLOT_WORKERS,
+    skip_unchanged_plots: bool = True,
+    translate_locations: bool = True,
+    deduplicate: bool = True,
+    profile: str | None = None,
+    prometheus: bool = False,
+):
+    run_dir = csv_path.parent
 
-    plot_save_path = csv_path.parent
+    # pool workers run the analyses of several fields one after another
+    METRICS.reset()
 
-    experience_bar(df, plot_save_path)
-    publishing_date_bar(df, plot_save_path)
-    publishing_day_bar(df, plot_save_path)
-    work_location_pie(df, plot_save_path)
-    salary_comparison_bar(df, plot_save_path)
-    technologies_bar(df, plot_save_path)
+    with profiled(run_dir / "analysis.prof", profile), timer("analysis"):
+        with timer("ingest"):
+            ingest_snapshot(run_dir)
+
+        with timer("clean"):
+            df = clean_data(
+                csv_path, translate_locations=translate_locations, deduplicate=deduplicate
+            )
+
+        with timer("save_clean"):
+            save_snapshot(densify(df), run_dir / MainConfig.CLEAN_PARQUET_NAME)
+
+        with timer("cube"):
+            cube = build_cube(df)
+            save_cube(cube, run_dir)
+
+        with timer("render"):
+            render_plots(
+                cube,
+                run_dir,
+                fmt=plot_format,
+                dpi=plot_dpi,
+                workers=plot_workers,
+                skip_unchanged=skip_unchanged_plots,
+            )
+
+    METRICS.incr("rows", len(df))
+    write_metrics(run_dir, "analysis", METRICS)
+    if prometheus:
+        write_prometheus(run_dir, "analysis", METRICS, field=run_dir.parent.name)
@@ -0,0 +1,232 @@
+import logging
+import re
+import zlib
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.warehouse import connect, get_warehouse_path
+from src.config import MainConfig
+from src.storage import load_snapshot, resolve_snapshot_file
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+# documents hashed together, bounds the (shingles x permutations) matrix
+CHUNK_SIZE = 64
+
+# Signatures and band buckets of every description seen so far, so a new
+# snapshot only hashes its new urls and looks their buckets up here
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS dedup_signatures (
+        url TEXT PRIMARY KEY,
+        canonical_url TEXT NOT NULL,
+        signature BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS dedup_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        PRIMARY KEY (band, bucket, url)
+    ) WITHOUT ROWID;
+"""
+
+
+class MinHasher:
+    def __init__(
+        self,
+        num_perm: int = MainConfig.DEDUP_NUM_PERM,
+        bands: int = MainConfig.DEDUP_BANDS,
+        shingle_size: int = MainConfig.DEDUP_SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"{num_perm} permutations do not split into {bands} bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+
+        # signatures are stored, so the permutations must not change between runs
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.shingle_weights = rng.randint(1, MERSENNE_PRIME, size=shingle_size, dtype=np.uint64)
+        self.band_weights = rng.randint(
+            1, MERSENNE_PRIME, size=num_perm // bands, dtype=np.uint64
+        )
+
+    def shingles(self, text) -> np.ndarray:
+        # texts shorter than one shingle are too short to call duplicates
+        tokens = TOKEN_PATTERN.findall(text.lower()) if isinstance(text, str) else []
+        if len(tokens) < self.shingle_size:
+            return np.empty(0, dtype=np.uint64)
+
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), np.uint64, len(tokens))
+
+        windows = np.lib.stride_tricks.sliding_window_view(hashes, self.shingle_size)
+        with np.errstate(over="ignore"):
+            combined = windows @ self.shingle_weights
+
+        return np.unique((combined ^ (combined >> np.uint64(32))) & MAX_HASH)
+
+    def signatures(self, texts: list) -> np.ndarray:
+        # rows without shingles stay at MAX_HASH and are never matched
+        signatures = np.full((len(texts), self.num_perm), MAX_HASH, dtype=np.uint64)
+
+        for start in range(0, len(texts), CHUNK_SIZE):
+            shingles = [self.shingles(text) for text in texts[start:start + CHUNK_SIZE]]
+            rows = [i for i, s in enumerate(shingles) if len(s)]
+            if not rows:
+                continue
+
+            hashes = np.concatenate([shingles[i] for i in rows])
+            offsets = np.cumsum([0] + [len(shingles[i]) for i in rows[:-1]])
+            with np.errstate(over="ignore"):
+                permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+
+            signatures[start + np.array(rows)] = np.minimum.reduceat(permuted, offsets, axis=0)
+
+        return signatures.astype(np.uint32)
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        bands = signatures.astype(np.uint64).reshape(
+            len(signatures), self.bands, self.num_perm // self.bands
+        )
+        with np.errstate(over="ignore"):
+            keys = (bands * self.band_weights).sum(axis=2)
+
+        # sqlite integers are signed
+        return keys.view(np.int64)
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> float:
+    return float(np.mean(left == right))
+
+
+def canonical_urls(
+    urls: pd.Series,
+    descriptions: pd.Series,
+    warehouse_path: Path | None = None,
+    threshold: float = MainConfig.DEDUP_THRESHOLD,
+) -> pd.Series:
+    # Maps every row to the url of the first posting of its description seen
+    # in any snapshot, or to its own url when there is none
+    hasher = MinHasher()
+    urls = urls.astype(object)
+    descriptions = descriptions.astype(object)
+
+    with closing(connect(warehouse_path)) as conn, conn:
+        conn.executescript(SCHEMA)
+
+        conn.execute("CREATE TEMP TABLE batch_urls (url TEXT PRIMARY KEY)")
+        conn.executemany(
+            "INSERT OR IGNORE INTO batch_urls VALUES (?)", [(u,) for u in urls.dropna()]
+        )
+        canonical = dict(conn.execute(
+            "SELECT url, canonical_url FROM dedup_signatures JOIN batch_urls USING (url)"
+        ))
+
+        new = pd.DataFrame({"url": urls, "description": descriptions})
+        new = new[new["url"].notna() & ~new["url"].isin(list(canonical))]
+        new = new.drop_duplicates("url")
+        new_urls = new["url"].tolist()
+
+        signatures = hasher.signatures(new["description"].tolist())
+        keys = hasher.band_keys(signatures)
+        hashed = (signatures != np.uint32(MAX_HASH)).any(axis=1)
+
+        buckets = [
+            (band, int(keys[row, band]), row)
+            for row in np.flatnonzero(hashed).tolist()
+            for band in range(hasher.bands)
+        ]
+        conn.execute("CREATE TEMP TABLE batch_buckets (band INTEGER, bucket INTEGER, row INTEGER)")
+        conn.executemany("INSERT INTO batch_buckets VALUES (?, ?, ?)", buckets)
+        candidates: dict[int, dict[str, tuple[str, bytes]]] = {}
+        for row, url, canonical_url, signature in conn.execute(
+            "SELECT DISTINCT b.row, d.url, s.canonical_url, s.signature "
+            "FROM batch_buckets b "
+            "JOIN dedup_buckets d ON d.band = b.band AND d.bucket = b.bucket "
+            "JOIN dedup_signatures s ON s.url = d.url"
+        ):
+            candidates.setdefault(row, {})[url] = (canonical_url, signature)
+
+        seen_buckets: dict[tuple[int, int], int] = {}
+        for row, url in enumerate(new_urls):
+            canonical[url] = url
+            if not hashed[row]:
+                continue
+
+            best = threshold
+            for canonical_url, signature in candidates.get(row, {}).values():
+                score = similarity(signatures[row], np.frombuffer(signature, dtype=np.uint32))
+                if score >= best:
+                    canonical[url], best = canonical_url, score
+
+            # postings of the same snapshot, matched against the earlier rows
+            for band in range(hasher.bands):
+                earlier = seen_buckets.setdefault((band, int(keys[row, band])), row)
+                if earlier != row and canonical[url] == url:
+                    if similarity(signatures[row], signatures[earlier]) >= threshold:
+                        canonical[url] = canonical[new_urls[earlier]]
+
+        conn.executemany(
+            "INSERT INTO dedup_signatures VALUES (?, ?, ?)",
+            [
+                (url, canonical[url], signatures[row].tobytes())
+                for row, url in enumerate(new_urls)
+                if hashed[row]
+            ],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO dedup_buckets VALUES (?, ?, ?)",
+            [(band, bucket, new_urls[row]) for band, bucket, row in buckets],
+        )
+        conn.execute("DROP TABLE batch_urls")
+        conn.execute("DROP TABLE batch_buckets")
+
+    matched = sum(canonical[url] != url for url in new_urls)
+    logger.info(
+        f"Hashed {len(new_urls)} new descriptions, {matched} of them repost earlier vacancies"
+    )
+    return urls.map(canonical)
+
+
+def near_duplicates(
+    urls: pd.Series, descriptions: pd.Series, warehouse_path: Path | None = None
+) -> pd.Series:
+    # True for every row after the first one of its canonical vacancy
+    canonical = canonical_urls(urls, descriptions, warehouse_path)
+    return canonical.duplicated() & canonical.notna()
+
+
+def index_history(data_dir: Path | None = None, warehouse_path: Path | None = None) -> int:
+    data_dir = Path(data_dir or MainConfig.DATA_DIR)
+    indexed = 0
+
+    # snapshot dirs are named by time, so the oldest posting becomes canonical
+    for snapshot_dir in sorted(
+        (p for p in data_dir.glob("*/*") if p.is_dir()), key=lambda p: p.name
+    ):
+        try:
+            resolve_snapshot_file(snapshot_dir)
+        except FileNotFoundError:
+            continue
+
+        df = load_snapshot(snapshot_dir, columns=["url", "description"])
+        canonical_urls(df["url"], df["description"], warehouse_path)
+        indexed += 1
+
+    return indexed
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+
+    setup_logging()
+    logger.info(f"Indexed descriptions of {index_history()} snapshots in {get_warehouse_path()}")
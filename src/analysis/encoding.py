@@ -0,0 +1,81 @@
+import logging
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def sparse_dummies(
+    values: pd.Series,
+    sep: str,
+    prefix: str,
+    vocabulary: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    # One sparse uint8 column per term; with a vocabulary the columns are
+    # fixed (and sorted) across snapshots and unknown terms are dropped.
+    # Only distinct strings are split, rows pick their terms by factorize code.
+    codes, uniques = pd.factorize(values)
+    split = [
+        {term.strip() for term in value.split(sep)} - {""}
+        for value in uniques
+    ]
+
+    if vocabulary is None:
+        columns = sorted(set().union(*split))
+    else:
+        columns = sorted(vocabulary)
+    column_index = {term: i for i, term in enumerate(columns)}
+
+    # the extra last row stays empty for missing values (code -1)
+    terms_by_value = np.zeros((len(columns), len(uniques) + 1), dtype=np.uint8)
+    unknown = 0
+    for i, terms in enumerate(split):
+        for term in terms:
+            if term in column_index:
+                terms_by_value[column_index[term], i] = 1
+            else:
+                unknown += 1
+
+    if unknown:
+        logger.debug(f"Dropped {unknown} {prefix} terms outside the vocabulary")
+
+    return pd.DataFrame(
+        {
+            f"{prefix}{term}": pd.arrays.SparseArray(terms_by_value[i][codes], fill_value=0)
+            for i, term in enumerate(columns)
+        },
+        index=values.index,
+    )
+
+
+def _stored_values(column: pd.Series) -> np.ndarray:
+    if isinstance(column.dtype, pd.SparseDtype):
+        return column.array.sp_values
+
+    return column.to_numpy()
+
+
+def dummy_counts(df: pd.DataFrame, prefix: str, include_zero: bool = False) -> pd.Series:
+    # summed as int64, a uint8 sum would wrap around at 256 mentions
+    counts = pd.Series(
+        {
+            column.removeprefix(prefix): _stored_values(df[column]).sum(dtype=np.int64)
+            for column in df.columns
+            if column.startswith(prefix)
+        },
+        dtype="int64",
+    )
+
+    return counts if include_zero else counts[counts > 0]
+
+
+def densify(df: pd.DataFrame) -> pd.DataFrame:
+    sparse_columns = [
+        column for column, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)
+    ]
+    if not sparse_columns:
+        return df
+
+    return df.assign(**{column: df[column].sparse.to_dense() for column in sparse_columns})
@@ -0,0 +1,134 @@
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# 2500, 2,5 or 90 000 (DOU groups hryvnia amounts with spaces)
+NUMBER = r"\d{1,3}(?:[ \u00a0\u202f]\d{3})+(?!\d)|\d+(?:[.,]\d+)?"
+CURRENCY = r"\$|€|₴|usd|eur|uah|грн"
+
+SALARY_PATTERN = re.compile(
+    rf"(?P<prefix>від|до|from|up\s+to)?\s*(?P<currency>{CURRENCY})?\s*"
+    rf"(?P<low>{NUMBER})\s*(?P<low_k>[kк])?"
+    rf"(?:\s*[–—-]\s*(?:{CURRENCY})?\s*(?P<high>{NUMBER})\s*(?P<high_k>[kк])?)?"
+    rf"\s*(?P<currency_suffix>{CURRENCY})?",
+    re.IGNORECASE,
+)
+
+CURRENCIES = {
+    "$": "USD", "usd": "USD",
+    "€": "EUR", "eur": "EUR",
+    "₴": "UAH", "грн": "UAH", "uah": "UAH",
+}
+
+MONTHS = {
+    "січня": 1, "лютого": 2, "березня": 3, "квітня": 4,
+    "травня": 5, "червня": 6, "липня": 7, "серпня": 8,
+    "вересня": 9, "жовтня": 10, "листопада": 11, "грудня": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4,
+    "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12,
+}
+
+# SALARY_BINS are dollars; DOU quotes bare amounts in dollars too, while
+# hryvnia and euro amounts are left out of the bins rather than converted
+# at a rate that would go stale
+SALARY_CURRENCY = "USD"
+SALARY_BINS = [0, 500, 1000, 1500, 2000, 3000, 4000, 5000, 7000, np.inf]
+SALARY_LABELS = [
+    "0-500", "500-1000", "1000-1500", "1500-2000",
+    "2000-3000", "3000-4000", "4000-5000", "5000-7000", "7000+"
+]
+
+DAYS_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+DATE_PATTERN = re.compile(r"(\d{1,2})\s+(\w+)\s+(\d{4})")
+
+
+def _to_number(values: pd.Series, k_suffix: pd.Series) -> pd.Series:
+    numbers = values.str.replace(r"\s", "", regex=True).str.replace(",", ".").astype(float)
+    numbers = numbers.where(k_suffix.isna(), numbers * 1000)
+
+    # bare "3" or "25" on DOU mean thousands and hundreds of dollars
+    return pd.Series(
+        np.select([numbers <= 10, numbers <= 100], [numbers * 1000, numbers * 100], numbers),
+        index=numbers.index,
+    )
+
+
+def _parse_unique_salaries(salaries: pd.Index) -> pd.DataFrame:
+    parts = pd.Series(salaries, dtype=object).str.extract(SALARY_PATTERN)
+
+    low = _to_number(parts["low"], parts["low_k"])
+    high = _to_number(parts["high"], parts["high_k"])
+
+    prefix = parts["prefix"].str.lower().str.split().str[0]
+    is_to = (prefix == "до") | (prefix == "up")
+    is_from = (prefix == "від") | (prefix == "from")
+
+    currency = parts["currency"].fillna(parts["currency_suffix"]).str.lower()
+
+    return pd.DataFrame({
+        "lower_salary": low.where(~is_to),
+        "upper_salary": high.mask(is_to, low).mask(is_from),
+        "salary_currency": currency.map(CURRENCIES),
+    })
+
+
+def parse_salaries(salary: pd.Series) -> pd.DataFrame:
+    # DOU salaries repeat a lot, so each distinct string is parsed once
+    codes, uniques = pd.factorize(salary)
+    parsed = _parse_unique_salaries(uniques)
+
+    return parsed.reindex(codes).set_axis(salary.index)
+
+
+def in_salary_currency(currency: pd.Series) -> pd.Series:
+    return currency.isna() | (currency == SALARY_CURRENCY)
+
+
+def parse_dates(dates: pd.Series) -> pd.Series:
+    codes, uniques = pd.factorize(dates)
+    parts = pd.Series(uniques, dtype=object).str.extract(DATE_PATTERN)
+
+    parsed = pd.to_datetime(
+        pd.DataFrame({
+            "year": pd.to_numeric(parts[2]),
+            "month": parts[1].str.lower().map(MONTHS),
+            "day": pd.to_numeric(parts[0]),
+        }),
+        errors="coerce",
+    )
+
+    return parsed.reindex(codes).set_axis(dates.index).rename(dates.name)
+
+
+# Single values for the streaming pipeline; cached because DOU repeats the
+# same salary and date strings across a whole listing
+@lru_cache(maxsize=4096)
+def parse_salary(salary: str | None) -> tuple[float, float, str | None]:
+    row = parse_salaries(pd.Series([salary], dtype=object)).iloc[0]
+    currency = row["salary_currency"]
+
+    return row["lower_salary"], row["upper_salary"], currency if isinstance(currency, str) else None
+
+
+@lru_cache(maxsize=4096)
+def parse_date(date: str | None) -> pd.Timestamp | None:
+    parsed = parse_dates(pd.Series([date], dtype=object)).iloc[0]
+
+    return None if pd.isna(parsed) else parsed
+
+
+def salary_range(salary: float, right: bool) -> str | None:
+    # the label pd.cut(..., SALARY_BINS, SALARY_LABELS, right=right) would give
+    if np.isnan(salary):
+        return None
+
+    index = bisect_left(SALARY_BINS, salary) if right else bisect_right(SALARY_BINS, salary)
+    if not 0 < index < len(SALARY_BINS):
+        return None
+
+    return SALARY_LABELS[index - 1]
@@ -1,19 +1,59 @@
+# Each plot is a query of the snapshot's cube (see src/analysis/cube.py),
+# small enough to send to a rendering process, and a function that draws it.
+# The payloads are named like RunningAggregates.plot_payloads, so
+# benchmarks/cube.py can compare the hashes of both
+
 import logging
 from pathlib import Path
 
+import matplotlib
+
+matplotlib.use("Agg")
+
 import numpy as np
 import matplotlib.pyplot as plt
-from pandas import DataFrame
+from pandas import CategoricalIndex, DataFrame, Series
 
+from src.analysis.cube import query_cube
+from src.analysis.normalization import DAYS_ORDER, SALARY_LABELS
 
 logger = logging.getLogger(__name__)
 
 
-def experience_bar(df: DataFrame, save_path: Path) -> None:
-    save_path = save_path / f"experience_bar.png"
+def _term_counts(counts: Series) -> Series:
+    return Series(counts.to_numpy(), index=counts.index.astype(str).rename(None))
+
+
+def experience_counts(cube: DataFrame) -> Series:
+    return query_cube(cube, by="experience_years").rename("count")
+
+
+def publishing_date_counts(cube: DataFrame) -> Series:
+    return query_cube(cube, by="date").rename("count")
+
+
+def publishing_day_counts(cube: DataFrame) -> Series:
+    counts = query_cube(cube, by="weekday").rename("count").reindex(DAYS_ORDER)
+    return counts.rename_axis("date")
+
+
+def location_counts(cube: DataFrame) -> tuple[Series, int]:
+    return _term_counts(query_cube(cube, by="location")).nlargest(10), query_cube(cube)
+
+
+def salary_range_counts(cube: DataFrame) -> DataFrame:
+    return DataFrame({
+        "lower": query_cube(cube, by="lower_salary_range").reindex(SALARY_LABELS, fill_value=0).to_numpy(),
+        "upper": query_cube(cube, by="upper_salary_range").reindex(SALARY_LABELS, fill_value=0).to_numpy(),
+    }, index=CategoricalIndex(SALARY_LABELS, categories=SALARY_LABELS, ordered=True))
+
 
-    experience_counts = df["experience_years"].value_counts(dropna=True).sort_index()
-    plt.figure(figsize=(12, 8))
+def technology_counts(cube: DataFrame) -> Series:
+    return _term_counts(query_cube(cube, by="technology")).nlargest(20)
+
+
+def experience_bar(experience_counts: Series, save_path: Path, dpi: int = 300) -> None:
+    plt.figure(figsize=(12, 8), layout="constrained")
 
     x_labels = [str(round(i, 2)) for i in experience_counts.index]
     y_values = experience_counts.values
@@ -25,18 +65,15 @@ def experience_bar(df: DataFrame, save_path: Path) -> None:
     plt.ylabel("Number of Vacancies")
     plt.xlabel("Years of Experience")
 
-    plt.savefig(save_path, bbox_inches="tight", dpi=300)
+    plt.savefig(save_path, dpi=dpi)
 
     logger.info(f"Saved experience bar plot to {save_path}")
 
     plt.close()
 
 
-def publishing_date_bar(df: DataFrame, save_path: Path) -> None:
-    save_path = save_path / f"publishing_date_bar.png"
-
-    date_counts = df["date"].value_counts(dropna=True).sort_index()
-    plt.figure(figsize=(12, 8))
+def publishing_date_bar(date_counts: Series, save_path: Path, dpi: int = 300) -> None:
+    plt.figure(figsize=(12, 8), layout="constrained")
 
     x_labels = [str(i.date()) for i in date_counts.index]
     y_values = date_counts.values
@@ -49,22 +86,15 @@ def publishing_date_bar(df: DataFrame, save_path: Path) -> None:
     plt.xlabel("Date of Publishing")
     plt.xticks(rotation=55)
 
-    plt.savefig(save_path, bbox_inches="tight", dpi=300)
+    plt.savefig(save_path, dpi=dpi)
 
     logger.info(f"Saved publishing date bar plot to {save_path}")
 
     plt.close()
 
 
-def publishing_day_bar(df: DataFrame, save_path: Path) -> None:
-    save_path = save_path / f"publishing_day_bar.png"
-
-    day_names_count = df["date"].dt.day_name().value_counts()
-
-    days_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    day_names_count = day_names_count.reindex(days_order)
-
-    plt.figure(figsize=(12, 8))
+def publishing_day_bar(day_names_count: Series, save_path: Path, dpi: int = 300) -> None:
+    plt.figure(figsize=(12, 8), layout="constrained")
 
     plt.bar(day_names_count.index, day_names_count, color="lightgreen", edgecolor="black", zorder=2)
     plt.grid(axis="y", linestyle="--", alpha=0.7)
@@ -73,19 +103,15 @@ def publishing_day_bar(df: DataFrame, save_path: Path) -> None:
     plt.ylabel("Number of Vacancies")
     plt.xlabel("Day of Publishing")
 
-    plt.savefig(save_path, bbox_inches="tight", dpi=300)
+    plt.savefig(save_path, dpi=dpi)
 
     logger.info(f"Saved publishing day bar plot to {save_path}")
 
     plt.close()
 
 
-def work_location_pie(df: DataFrame, save_path: Path) -> None:
-    save_path = save_path / f"work_location_pie.png"
-
-    locations = df.filter(like="loc_")
-    total_vacancies = locations.shape[0]
-    top_10_locations = locations.sum().nlargest(10)
+def work_location_pie(location_counts: tuple[Series, int], save_path: Path, dpi: int = 300) -> None:
+    top_10_locations, total_vacancies = location_counts
 
     def custom_pct(values):
         def format_string(pct):
@@ -95,38 +121,33 @@ def work_location_pie(df: DataFrame, save_path: Path) -> None:
 
         return format_string
 
-    plt.figure(figsize=(10, 8))
+    plt.figure(figsize=(10, 8), layout="constrained")
 
     plt.pie(
         top_10_locations,
-        labels=top_10_locations.index.str.replace("loc_", ""),
+        labels=top_10_locations.index,
         autopct=custom_pct(top_10_locations),
         pctdistance=0.8
     )
 
     plt.title(f"Top 10 Work Locations out of {total_vacancies} Vacancies")
 
-    plt.savefig(save_path, bbox_inches="tight", dpi=300)
+    plt.savefig(save_path, dpi=dpi)
 
     logger.info(f"Saved work location pie plot to {save_path}")
 
     plt.close()
 
 
-def salary_comparison_bar(df: DataFrame, save_path: Path) -> None:
-    save_path = save_path / f"salary_comparison_bar.png"
-
-    lower_counts = df["lower_salary_range"].value_counts(sort=False)
-    upper_counts = df["upper_salary_range"].value_counts(sort=False)
-
-    x_indexes = np.arange(len(lower_counts.index))
+def salary_comparison_bar(salary_counts: DataFrame, save_path: Path, dpi: int = 300) -> None:
+    x_indexes = np.arange(len(salary_counts.index))
     bar_width = 0.4
 
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig, ax = plt.subplots(figsize=(12, 8), layout="constrained")
 
-    ax.bar(x_indexes - bar_width / 2, lower_counts.values, width=bar_width,
+    ax.bar(x_indexes - bar_width / 2, salary_counts["lower"].values, width=bar_width,
            color="lightblue", edgecolor="black", label="Lower Salary", zorder=2)
-    ax.bar(x_indexes + bar_width / 2, upper_counts.values, width=bar_width,
+    ax.bar(x_indexes + bar_width / 2, salary_counts["upper"].values, width=bar_width,
            color="lightgreen", edgecolor="black", label="Upper Salary", zorder=2)
 
     ax.set_title("Salary Ranges: Lower vs. Upper")
@@ -134,27 +155,22 @@ def salary_comparison_bar(df: DataFrame, save_path: Path) -> None:
     ax.set_xlabel("Salary ($)")
 
     ax.set_xticks(x_indexes)
-    ax.set_xticklabels(lower_counts.index, rotation=45)
+    ax.set_xticklabels(salary_counts.index, rotation=45)
 
     ax.grid(axis="y", linestyle="--", alpha=0.7)
     ax.legend()
 
-    plt.savefig(save_path, bbox_inches="tight", dpi=300)
+    plt.savefig(save_path, dpi=dpi)
 
     logger.info(f"Saved salary range bar plot to {save_path}")
 
     plt.close()
 
 
-def technologies_bar(df: DataFrame, save_path: Path) -> None:
-    save_path = save_path / f"technologies_bar.png"
-
-    technologies = df.filter(like="tech_")
-    top_20_technologies = technologies.sum().nlargest(20)
+def technologies_bar(top_20_technologies: Series, save_path: Path, dpi: int = 300) -> None:
+    plt.figure(figsize=(12, 8), layout="constrained")
 
-    plt.figure(figsize=(12, 8))
-
-    plt.bar(top_20_technologies.index.str.replace("tech_", ""),
+    plt.bar(top_20_technologies.index,
             top_20_technologies,
             color="lightgreen",
             edgecolor="black",
@@ -167,8 +183,19 @@ def technologies_bar(df: DataFrame, save_path: Path) -> None:
     plt.xlabel("Technology")
     plt.xticks(rotation=35)
 
-    plt.savefig(save_path, bbox_inches="tight", dpi=300)
+    plt.savefig(save_path, dpi=dpi)
 
     logger.info(f"Saved technologies bar plot to {save_path}")
 
     plt.close()
+
+
+# plot name (also the file name) -> (aggregation, drawing)
+PLOTS = {
+    "experience_bar": (experience_counts, experience_bar),
+    "publishing_date_bar": (publishing_date_counts, publishing_date_bar),
+    "publishing_day_bar": (publishing_day_counts, publishing_day_bar),
+    "work_location_pie": (location_counts, work_location_pie),
+    "salary_comparison_bar": (salary_range_counts, salary_comparison_bar),
+    "technologies_bar": (technology_counts, technologies_bar),
+}
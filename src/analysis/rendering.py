@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from pandas import DataFrame, Series
+
+from src.analysis.plots import PLOTS
+from src.config import MainConfig
+from src.instrumentation import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(payload):
+    # equal frames can pickle differently (a DatetimeIndex caches its freq),
+    # so only the names, labels and values that are drawn are hashed
+    if isinstance(payload, tuple):
+        return tuple(_canonical(part) for part in payload)
+    if isinstance(payload, Series):
+        return payload.name, payload.index.name, payload.index.tolist(), payload.tolist()
+    if isinstance(payload, DataFrame):
+        return payload.index.name, payload.index.tolist(), payload.to_dict("list")
+
+    return payload
+
+
+def _payload_hash(payload, fmt: str, dpi: int) -> str:
+    return hashlib.sha256(pickle.dumps((_canonical(payload), fmt, dpi))).hexdigest()
+
+
+def _render(name: str, payload, save_path: Path, dpi: int) -> float:
+    start = time.perf_counter()
+    PLOTS[name][1](payload, save_path, dpi=dpi)
+
+    return time.perf_counter() - start
+
+
+def _load_manifest(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def render_plots(
+    cube: DataFrame,
+    save_dir: Path,
+    fmt: str = MainConfig.PLOT_FORMAT,
+    dpi: int = MainConfig.PLOT_DPI,
+    workers: int = MainConfig.PLOT_WORKERS,
+    skip_unchanged: bool = True,
+) -> dict[str, Path]:
+    payloads = {name: aggregate(cube) for name, (aggregate, _) in PLOTS.items()}
+
+    return render_payloads(payloads, save_dir, fmt, dpi, workers, skip_unchanged)
+
+
+def render_payloads(
+    payloads: dict,
+    save_dir: Path,
+    fmt: str = MainConfig.PLOT_FORMAT,
+    dpi: int = MainConfig.PLOT_DPI,
+    workers: int = MainConfig.PLOT_WORKERS,
+    skip_unchanged: bool = True,
+) -> dict[str, Path]:
+    if fmt not in MainConfig.PLOT_FORMATS:
+        raise ValueError(f"Unknown plot format {fmt!r}, expected one of {MainConfig.PLOT_FORMATS}")
+
+    start = time.perf_counter()
+    manifest_path = save_dir / MainConfig.PLOTS_MANIFEST_NAME
+    manifest = _load_manifest(manifest_path) if skip_unchanged else {}
+
+    outputs = {}
+    pending = {}
+    for name, payload in payloads.items():
+        save_path = save_dir / f"{name}.{fmt}"
+        payload_hash = _payload_hash(payload, fmt, dpi)
+
+        outputs[name] = save_path
+        if manifest.get(name) == payload_hash and save_path.exists():
+            logger.info(f"{name} data is unchanged, keeping {save_path}")
+            continue
+
+        manifest[name] = payload_hash
+        pending[name] = (payload, save_path)
+
+    workers = min(workers or 1, len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_render, name, payload, save_path, dpi): name
+                for name, (payload, save_path) in pending.items()
+            }
+            timings = {futures[future]: future.result() for future in as_completed(futures)}
+    else:
+        timings = {
+            name: _render(name, payload, save_path, dpi)
+            for name, (payload, save_path) in pending.items()
+        }
+
+    for name, seconds in timings.items():
+        METRICS.observe(f"plot.{name}", seconds)
+        logger.info(f"Rendered {name} in {seconds:.2f}s")
+
+    manifest_path.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+
+    logger.info(
+        f"Rendered {len(pending)}/{len(payloads)} plots with {max(workers, 1)} workers "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return outputs
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable
+
+from src.config import MainConfig
+from src.instrumentation import incr
+
+logger = logging.getLogger(__name__)
+
+
+class LocationTranslator:
+    # Google refuses texts over 5000 characters
+    MAX_BATCH_CHARS = 4500
+    LOCATION_SEP = ", "
+
+    def __init__(self, cache_path: Path | None = None, source: str = "uk", target: str = "en"):
+        self.cache_path = Path(cache_path or MainConfig.DATA_DIR / MainConfig.TRANSLATION_CACHE_NAME)
+        self.source = source
+        self.target = target
+        self.cache: dict[str, str] = {}
+        self.new_entries = 0
+
+        if self.cache_path.exists():
+            self.cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+
+    def translate_locations(self, locations: Iterable[str]) -> dict[str, str]:
+        locations = set(locations)
+        parts = {part for loc in locations for part in loc.split(self.LOCATION_SEP)}
+
+        known = {**MainConfig.LOCATION_TRANSLATIONS, **self.cache}
+        missing = sorted(parts - known.keys())
+        incr("translation_cache_hits", len(parts) - len(missing))
+        incr("translation_cache_misses", len(missing))
+        logger.info(
+            f"Location translation cache: {len(parts) - len(missing)}/{len(parts)} hits"
+        )
+
+        translated = {**known, **self._translate_missing(missing)}
+        self.save()
+
+        return {
+            loc: self.LOCATION_SEP.join(
+                translated.get(part, part) for part in loc.split(self.LOCATION_SEP)
+            )
+            for loc in locations
+        }
+
+    def _translate_missing(self, missing: list[str]) -> dict[str, str]:
+        if not missing:
+            return {}
+
+        # deep_translator pulls in requests and bs4, only needed on cache misses
+        from deep_translator import GoogleTranslator
+        from deep_translator.exceptions import BaseError
+        from requests import RequestException
+
+        translator = GoogleTranslator(source=self.source, target=self.target)
+        translated = {}
+
+        for batch in self._batches(missing):
+            try:
+                result = translator.translate("\n".join(batch)).split("\n")
+                if len(result) != len(batch):
+                    logger.warning("Batched translation lost lines, translating one by one")
+                    result = [translator.translate(text) for text in batch]
+            except (BaseError, RequestException) as e:
+                # untranslated names are not cached, so the next run retries them
+                logger.warning(f"Could not translate {len(batch)} locations, keeping originals: {e}")
+                continue
+
+            for text, translation in zip(batch, result):
+                translated[text] = translation.strip()
+
+        self.cache.update(translated)
+        self.new_entries += len(translated)
+
+        return translated
+
+    def _batches(self, texts: list[str]) -> Iterable[list[str]]:
+        batch = []
+        size = 0
+        for text in texts:
+            if batch and size + len(text) + 1 > self.MAX_BATCH_CHARS:
+                yield batch
+                batch = []
+                size = 0
+
+            batch.append(text)
+            size += len(text) + 1
+
+        if batch:
+            yield batch
+
+    def save(self) -> None:
+        if not self.new_entries:
+            return
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # analyses of other fields may have saved the cache in the meantime
+        if self.cache_path.exists():
+            saved = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            self.cache = {**saved, **self.cache}
+
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(self.cache, ensure_ascii=False, indent=1, sort_keys=True),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.cache_path)
+
+        logger.info(f"Saved {self.new_entries} new location translations to {self.cache_path}")
+        self.new_entries = 0
@@ -0,0 +1,349 @@
+import logging
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.analysis.normalization import in_salary_currency, parse_dates, parse_salaries
+from src.config import MainConfig
+from src.storage import load_snapshot, resolve_snapshot_file
+
+logger = logging.getLogger(__name__)
+
+WAREHOUSE_COLUMNS = [
+    "name", "company_name", "salary", "experience_years", "date",
+    "location", "technologies", "url"
+]
+
+# Every run is appended as one snapshot; "vacancies" keeps a single row per
+# url with the first and last day it was listed. The tech and location tables
+# repeat field and taken_at so the trend queries are served from their indexes.
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        snapshot TEXT PRIMARY KEY,
+        field TEXT NOT NULL,
+        taken_at TEXT NOT NULL,
+        vacancies INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS vacancies (
+        url TEXT PRIMARY KEY,
+        name TEXT,
+        company_name TEXT,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS observations (
+        snapshot TEXT NOT NULL,
+        url TEXT NOT NULL,
+        field TEXT NOT NULL,
+        taken_at TEXT NOT NULL,
+        published TEXT,
+        lower_salary REAL,
+        upper_salary REAL,
+        experience_years REAL,
+        PRIMARY KEY (snapshot, url)
+    );
+    CREATE TABLE IF NOT EXISTS observation_tech (
+        snapshot TEXT NOT NULL,
+        url TEXT NOT NULL,
+        field TEXT NOT NULL,
+        taken_at TEXT NOT NULL,
+        tech TEXT NOT NULL,
+        PRIMARY KEY (snapshot, url, tech)
+    );
+    CREATE TABLE IF NOT EXISTS observation_location (
+        snapshot TEXT NOT NULL,
+        url TEXT NOT NULL,
+        field TEXT NOT NULL,
+        taken_at TEXT NOT NULL,
+        location TEXT NOT NULL,
+        PRIMARY KEY (snapshot, url, location)
+    );
+    CREATE INDEX IF NOT EXISTS observations_trend
+        ON observations (field, taken_at, url, lower_salary, upper_salary);
+    CREATE INDEX IF NOT EXISTS observation_tech_trend
+        ON observation_tech (field, taken_at, tech, url);
+    CREATE INDEX IF NOT EXISTS observation_location_trend
+        ON observation_location (field, taken_at, location, url);
+"""
+
+PERIOD_FORMATS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+
+
+def get_warehouse_path() -> Path:
+    return MainConfig.DATA_DIR / MainConfig.WAREHOUSE_NAME
+
+
+def connect(warehouse_path: Path | None = None) -> sqlite3.Connection:
+    warehouse_path = Path(warehouse_path or get_warehouse_path())
+    warehouse_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # analyses of several fields run in parallel processes
+    conn = sqlite3.connect(warehouse_path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+
+    return conn
+
+
+def get_snapshot_time(snapshot_dir: Path) -> str:
+    try:
+        taken_at = datetime.strptime(snapshot_dir.name, MainConfig.SNAPSHOT_TIME_FORMAT)
+    except ValueError:
+        taken_at = datetime.fromtimestamp(resolve_snapshot_file(snapshot_dir).stat().st_mtime)
+
+    return taken_at.strftime("%Y-%m-%d")
+
+
+def _records(df: pd.DataFrame) -> list[tuple]:
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def _exploded(df: pd.DataFrame, column: str, sep: str) -> pd.DataFrame:
+    values = df[column].astype(object).str.split(sep).explode().str.strip()
+    exploded = df[["url"]].join(values)
+
+    return exploded[exploded[column].fillna("") != ""].drop_duplicates()
+
+
+def is_observation(snapshot_dir: Path, warehouse_path: Path | None = None) -> bool:
+    # Replays re-run an older snapshot from the HTTP cache, and snapshots
+    # outside DATA_DIR (copies, benchmark runs) are not crawls of its warehouse
+    replay_marker = snapshot_dir / MainConfig.REPLAY_MARKER_NAME
+    if replay_marker.exists():
+        logger.info(
+            f"{snapshot_dir} replays {replay_marker.read_text(encoding='utf-8').strip()}, "
+            f"not ingesting it into the warehouse"
+        )
+        return False
+
+    if warehouse_path is None and not snapshot_dir.resolve().is_relative_to(
+        MainConfig.DATA_DIR.resolve()
+    ):
+        logger.info(f"{snapshot_dir} is outside {MainConfig.DATA_DIR}, not ingesting it")
+        return False
+
+    return True
+
+
+def ingest_snapshot(snapshot_dir: Path, warehouse_path: Path | None = None) -> bool:
+    snapshot_dir = Path(snapshot_dir)
+    if not is_observation(snapshot_dir, warehouse_path):
+        return False
+
+    field = snapshot_dir.parent.name
+    snapshot = f"{field}/{snapshot_dir.name}"
+    taken_at = get_snapshot_time(snapshot_dir)
+
+    with closing(connect(warehouse_path)) as conn, conn:
+        if conn.execute(
+            "SELECT 1 FROM snapshots WHERE snapshot = ?", (snapshot,)
+        ).fetchone():
+            logger.info(f"Snapshot {snapshot} is already in the warehouse")
+            return False
+
+        df = load_snapshot(snapshot_dir, columns=WAREHOUSE_COLUMNS)
+        df = df.dropna(subset=["url"]).drop_duplicates("url").reset_index(drop=True)
+
+        salaries = parse_salaries(df["salary"])
+        # the salary trends average dollar amounts only
+        salaries = salaries.where(in_salary_currency(salaries["salary_currency"]), axis=0)
+        published = parse_dates(df["date"]).dt.strftime("%Y-%m-%d")
+
+        observations = pd.DataFrame({
+            "snapshot": snapshot,
+            "url": df["url"],
+            "field": field,
+            "taken_at": taken_at,
+            "published": published,
+            "lower_salary": salaries["lower_salary"],
+            "upper_salary": salaries["upper_salary"],
+            "experience_years": df["experience_years"],
+        })
+        vacancies = df[["url", "name", "company_name"]].assign(
+            first_seen=taken_at, last_seen=taken_at
+        )
+        techs = _exploded(df, "technologies", ",")
+        locations = _exploded(df, "location", ", ")
+
+        conn.execute(
+            "INSERT INTO snapshots VALUES (?, ?, ?, ?)",
+            (snapshot, field, taken_at, len(df)),
+        )
+        conn.executemany(
+            "INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            _records(observations),
+        )
+        conn.executemany(
+            "INSERT INTO vacancies VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (url) DO UPDATE SET "
+            "name = excluded.name, company_name = excluded.company_name, "
+            "first_seen = MIN(first_seen, excluded.first_seen), "
+            "last_seen = MAX(last_seen, excluded.last_seen)",
+            _records(vacancies),
+        )
+        conn.executemany(
+            "INSERT INTO observation_tech VALUES (?, ?, ?, ?, ?)",
+            [(snapshot, url, field, taken_at, tech) for url, tech in _records(techs)],
+        )
+        conn.executemany(
+            "INSERT INTO observation_location VALUES (?, ?, ?, ?, ?)",
+            [(snapshot, url, field, taken_at, loc) for url, loc in _records(locations)],
+        )
+
+    logger.info(f"Ingested {len(df)} vacancies of {snapshot} into the warehouse")
+    return True
+
+
+def ingest_history(data_dir: Path | None = None, warehouse_path: Path | None = None) -> int:
+    data_dir = Path(data_dir or MainConfig.DATA_DIR)
+    ingested = 0
+
+    for snapshot_dir in sorted(p for p in data_dir.glob("*/*") if p.is_dir()):
+        try:
+            resolve_snapshot_file(snapshot_dir)
+        except FileNotFoundError:
+            continue
+
+        ingested += ingest_snapshot(snapshot_dir, warehouse_path)
+
+    return ingested
+
+
+def _period_filter(since: str | None, until: str | None) -> tuple[str, list[str]]:
+    clauses = []
+    params = []
+    if since:
+        clauses.append("AND taken_at >= ?")
+        params.append(since)
+    if until:
+        clauses.append("AND taken_at <= ?")
+        params.append(until)
+
+    return " ".join(clauses), params
+
+
+def _query(sql: str, params: list, warehouse_path: Path | None) -> pd.DataFrame:
+    with closing(connect(warehouse_path)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def salary_trend(
+    field: str,
+    period: str = "month",
+    since: str | None = None,
+    until: str | None = None,
+    warehouse_path: Path | None = None,
+) -> pd.DataFrame:
+    # a vacancy listed every day of a month counts once in that month
+    time_filter, params = _period_filter(since, until)
+    sql = f"""
+        SELECT period,
+               COUNT(*) AS vacancies,
+               COUNT(COALESCE(lower_salary, upper_salary)) AS with_salary,
+               AVG(lower_salary) AS avg_lower_salary,
+               AVG(upper_salary) AS avg_upper_salary,
+               MIN(lower_salary) AS min_lower_salary,
+               MAX(upper_salary) AS max_upper_salary
+        FROM (
+            SELECT strftime(?, taken_at) AS period, url,
+                   AVG(lower_salary) AS lower_salary,
+                   AVG(upper_salary) AS upper_salary
+            FROM observations
+            WHERE field = ? {time_filter}
+            GROUP BY period, url
+        )
+        GROUP BY period
+        ORDER BY period
+    """
+    return _query(sql, [PERIOD_FORMATS[period], field, *params], warehouse_path)
+
+
+def _mention_trend(
+    table: str,
+    column: str,
+    field: str,
+    values: list[str] | None,
+    period: str,
+    since: str | None,
+    until: str | None,
+    warehouse_path: Path | None,
+) -> pd.DataFrame:
+    time_filter, time_params = _period_filter(since, until)
+    value_filter = ""
+    if values:
+        value_filter = f"AND {column} IN ({', '.join('?' * len(values))})"
+
+    period_format = PERIOD_FORMATS[period]
+    sql = f"""
+        WITH totals AS (
+            SELECT strftime(?, taken_at) AS period, COUNT(DISTINCT url) AS total
+            FROM observations
+            WHERE field = ? {time_filter}
+            GROUP BY period
+        ),
+        mentions AS (
+            SELECT strftime(?, taken_at) AS period, {column},
+                   COUNT(DISTINCT url) AS vacancies
+            FROM {table}
+            WHERE field = ? {time_filter} {value_filter}
+            GROUP BY period, {column}
+        )
+        SELECT mentions.period, {column}, vacancies,
+               CAST(vacancies AS REAL) / total AS share
+        FROM mentions JOIN totals USING (period)
+        ORDER BY mentions.period, vacancies DESC
+    """
+    params = [
+        period_format, field, *time_params,
+        period_format, field, *time_params, *(values or []),
+    ]
+    return _query(sql, params, warehouse_path)
+
+
+def tech_trend(
+    field: str,
+    techs: list[str] | None = None,
+    period: str = "month",
+    since: str | None = None,
+    until: str | None = None,
+    warehouse_path: Path | None = None,
+) -> pd.DataFrame:
+    return _mention_trend(
+        "observation_tech", "tech", field, techs, period, since, until, warehouse_path
+    )
+
+
+def location_trend(
+    field: str,
+    locations: list[str] | None = None,
+    period: str = "month",
+    since: str | None = None,
+    until: str | None = None,
+    warehouse_path: Path | None = None,
+) -> pd.DataFrame:
+    return _mention_trend(
+        "observation_location", "location", field, locations, period, since, until,
+        warehouse_path
+    )
+
+
+def vacancy_lifetimes(field: str, warehouse_path: Path | None = None) -> pd.DataFrame:
+    sql = """
+        SELECT url, name, company_name, first_seen, last_seen,
+               julianday(last_seen) - julianday(first_seen) + 1 AS days_listed
+        FROM vacancies
+        WHERE url IN (SELECT url FROM observations WHERE field = ?)
+        ORDER BY first_seen
+    """
+    return _query(sql, [field], warehouse_path)
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+
+    setup_logging()
+    logger.info(f"Ingested {ingest_history()} snapshots into {get_warehouse_path()}")
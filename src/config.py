@@ -7,9 +7,80 @@ class MainConfig:
     DATA_DIR = SRC_DIR / "data"
     LOGS_DIR = SRC_DIR / "logs"
     CSV_NAME = "raw_data.csv"
+    PARQUET_NAME = "raw_data.parquet"
+    CLEAN_PARQUET_NAME = "clean_data.parquet"
+    CUBE_NAME = "cube.parquet"
+    SEEN_INDEX_NAME = "seen_vacancies.json"
+    HTTPCACHE_NAME = "httpcache.sqlite"
+    THROTTLE_STATE_NAME = "throttle_state.json"
+    THROUGHPUT_STATS_NAME = "crawl_stats.json"
+    WAREHOUSE_NAME = "warehouse.sqlite"
+    TRANSLATION_CACHE_NAME = "location_translations.json"
+    PLOTS_MANIFEST_NAME = "plots.json"
+    AGGREGATES_NAME = "aggregates.json"
+    METRICS_NAME = "metrics.json"
+    PROMETHEUS_NAME = "metrics.prom"
+    JOB_DIR_NAME = "job"
+    CHECKPOINT_NAME = "checkpoint.json"
+    REPLAY_MARKER_NAME = "replay_of.txt"
+    SNAPSHOT_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S"
 
     DOU_URL: str = "https://jobs.dou.ua"
-    PYTHON_VACANCIES: str = "/vacancies/?category=Python"
+    VACANCIES_PATH: str = "/vacancies/"
+    VACANCIES_XHR_PATH: str = "/vacancies/xhr-load/"
+
+    # field name used in data paths -> DOU vacancies category
+    CATEGORIES = {
+        "python": "Python",
+        "java": "Java",
+        "javascript": "Front End",
+        "node-js": "Node.js",
+        "dotnet": ".NET",
+        "php": "PHP",
+        "golang": "Golang",
+        "devops": "DevOps",
+        "data-science": "Data Science",
+        "qa": "QA",
+    }
+
+    # Most concurrent requests to jobs.dou.ua, shared by all crawls of one run
+    DOWNLOAD_SLOT_BUDGET = 8
+
+    # "xhr" pages through the list endpoint with plain requests,
+    # "selenium" renders the list in a pooled headless Chrome and clicks "More"
+    LIST_LOADING_MODE = "xhr"
+
+    # PLOT_WORKERS processes render the plots, shared between the analyses
+    # a run or the daemon starts side by side
+    PLOT_FORMATS = ("png", "svg", "webp")
+    PLOT_FORMAT = "png"
+    PLOT_DPI = 300
+    PLOT_WORKERS = 4
+
+    # MinHash/LSH over description shingles: 16 bands of 8 rows put pairs from
+    # about 0.7 Jaccard in a shared bucket, DEDUP_THRESHOLD confirms them
+    DEDUP_SHINGLE_SIZE = 5
+    DEDUP_NUM_PERM = 128
+    DEDUP_BANDS = 16
+    DEDUP_THRESHOLD = 0.8
+
+    # `main.py daemon`: crawl schedules as cron specs (minute hour day month
+    # weekday), per field or DAEMON_SCHEDULE, each start delayed by up to
+    # DAEMON_JITTER seconds. Crawls beyond DAEMON_MAX_CRAWLS wait in a queue
+    DAEMON_SCHEDULE = "0 */6 * * *"
+    DAEMON_SCHEDULES = {}
+    DAEMON_JITTER = 600
+    DAEMON_MAX_CRAWLS = 1
+    DAEMON_ANALYSIS_WORKERS = 1
+    DAEMON_STATUS_PORT = 8787
+
+    # optional compressed copy of the feed, written alongside the CSV/Parquet
+    FEED_ARCHIVES = {
+        "jsonl.gz": ("jsonlines", "scrapy.extensions.postprocessing.GzipPlugin"),
+        "jsonl.zst": ("jsonlines", "src.scrape.postprocessing.ZstdPlugin"),
+        "csv.gz": ("csv", "scrapy.extensions.postprocessing.GzipPlugin"),
+        "csv.zst": ("csv", "src.scrape.postprocessing.ZstdPlugin"),
+    }
 
     TECH_KEYWORDS = {
         "python",
@@ -50,6 +121,58 @@ class MainConfig:
         "rabbitmq",
         "kafka",
         "elasticsearch",
+        "node.js",
+    }
+
+    # alternative spellings -> canonical name from TECH_KEYWORDS
+    TECH_ALIASES = {
+        "postgres": "postgresql",
+        "k8s": "kubernetes",
+        "ci-cd": "ci/cd",
+        "cicd": "ci/cd",
+        "node js": "node.js",
+        "nodejs": "node.js",
+        "google cloud": "gcp",
+        "amazon web services": "aws",
+        "rabbit mq": "rabbitmq",
+        "mongo db": "mongodb",
+        "elastic search": "elasticsearch",
+        "asyncio": "async",
+    }
+
+    # Known DOU locations, so most runs never need the translator
+    LOCATION_TRANSLATIONS = {
+        "віддалено": "remote",
+        "за кордоном": "abroad",
+        "Київ": "Kyiv",
+        "Львів": "Lviv",
+        "Харків": "Kharkiv",
+        "Дніпро": "Dnipro",
+        "Одеса": "Odesa",
+        "Вінниця": "Vinnytsia",
+        "Запоріжжя": "Zaporizhzhia",
+        "Івано-Франківськ": "Ivano-Frankivsk",
+        "Тернопіль": "Ternopil",
+        "Чернівці": "Chernivtsi",
+        "Ужгород": "Uzhhorod",
+        "Луцьк": "Lutsk",
+        "Рівне": "Rivne",
+        "Хмельницький": "Khmelnytskyi",
+        "Житомир": "Zhytomyr",
+        "Черкаси": "Cherkasy",
+        "Полтава": "Poltava",
+        "Суми": "Sumy",
+        "Чернігів": "Chernihiv",
+        "Миколаїв": "Mykolaiv",
+        "Херсон": "Kherson",
+        "Кропивницький": "Kropyvnytskyi",
+        "Кривий Ріг": "Kryvyi Rih",
+        "Кременчук": "Kremenchuk",
+        "Біла Церква": "Bila Tserkva",
+        "Мукачево": "Mukachevo",
+        "Кам'янець-Подільський": "Kamianets-Podilskyi",
+        "Маріуполь": "Mariupol",
+        "Краматорськ": "Kramatorsk",
     }
 
     CRAWLER_SETTINGS = {
@@ -57,6 +180,56 @@ class MainConfig:
         "AppleWebKit/537.36 (KHTML, like Gecko) "
         "Chrome/120.0.0.0 Safari/537.36",
         "LOG_ENABLED": False,
+        "FEED_EXPORTERS": {
+            "parquet": "src.scrape.exporters.ParquetItemExporter",
+        },
+        "ITEM_PIPELINES": {
+            "src.scrape.pipelines.ScrapePipeline": 300,
+        },
+        "DOWNLOADER_MIDDLEWARES": {
+            "src.scrape.middlewares.ScrapeDownloaderMiddleware": 543,
+            # after the HTTP cache, so rendered pages are cached and replayed too
+            "src.scrape.browser_pool.BrowserPoolMiddleware": 950,
+        },
+        "EXTENSIONS": {
+            "src.scrape.extensions.ReactorLagMonitor": 500,
+            "src.scrape.extensions.AdaptiveThrottle": 510,
+            "src.scrape.extensions.ThroughputStats": 520,
+            "src.scrape.extensions.RunMetrics": 530,
+            "src.scrape.extensions.CrawlCheckpoint": 540,
+        },
+        # Starting point for each crawl; AdaptiveThrottle moves from here
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+        "DOWNLOAD_DELAY": 1,
+        "ADAPTIVE_THROTTLE_ENABLED": True,
+        "ADAPTIVE_THROTTLE_TARGET_LATENCY": 1.0,
+        "ADAPTIVE_THROTTLE_MIN_DELAY": 0.25,
+        "ADAPTIVE_THROTTLE_MAX_DELAY": 60,
+        "ADAPTIVE_THROTTLE_WINDOW": 20,
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_STORAGE": "src.scrape.httpcache.SqliteCacheStorage",
+        "HTTPCACHE_POLICY": "scrapy.extensions.httpcache.RFC2616Policy",
+        "HTTPCACHE_ALWAYS_STORE": True,
+        "HTTPCACHE_IGNORE_HTTP_CODES": [429, 500, 502, 503, 504],
+        # processes for description regex work, 0 parses on the reactor thread
+        "PARSE_WORKERS": 0,
+        # "lxml" or "parsel", see src/scrape/extraction.py
+        "DETAIL_EXTRACTOR": "lxml",
+        "REACTOR_LAG_INTERVAL": 0.1,
+        # running plot aggregates per crawl, saved to AGGREGATES_NAME when it
+        # closes. The plots are drawn by the analysis of the deduplicated feed
+        "STREAMING_AGGREGATES_ENABLED": True,
+        # one of FEED_ARCHIVES
+        "FEED_ARCHIVE": None,
+        # headless Chrome for requests with meta["render_js"], launched on first use.
+        # Every crawl of the process shares the pool and its BROWSER_POOL_SIZE slots
+        "BROWSER_POOL_SIZE": 2,
+        "BROWSER_POOL_MAX_USES": 50,
+        "BROWSER_POOL_MEMORY_LIMIT_MB": 1024,
+        "BROWSER_POOL_PAGE_LOAD_TIMEOUT": 30,
+        "METRICS_PROMETHEUS_ENABLED": False,
+        # seconds between checkpoints of the discovered vacancy urls, 0 disables
+        "CHECKPOINT_INTERVAL": 30,
         "FEED_EXPORT_FIELDS": [
             "name",
             "company_name",
@@ -84,7 +257,9 @@ class ExtractExperiencePatterns:
         r"(?:працює|має|існує)|ринок|ринку|історія|заснована|користувачів|клієнтів|працює)\b"
     )
 
-    DATE_GUARD = re.compile(r"\d{2}[./-]\d{2}[./-]\d{4}|\d{4}[./-]\d{2}[./-]\d{2}")
+    # dd.mm.yyyy or yyyy.mm.dd, with the leading digits factored out
+    # so the scan can skip ahead to digits
+    DATE_GUARD = re.compile(r"\d\d(?:[./-]\d{2}[./-]\d{4}|\d\d[./-]\d{2}[./-]\d{2})")
 
     YEARS_PATTERN = re.compile(
         r"(?<![\d.])(\d+(?:[.,]\d+)?)\s*(?:\+|plus)?\s*(?:years?|yrs?|y\.?o\.?|роки?|років|р\.)(?![\w-])",
@@ -95,3 +270,12 @@ class ExtractExperiencePatterns:
         r"(?<![\d.])(\d+(?:[.,]\d+)?)\s*(?:\+|plus)?\s*(?:months?|mos?|місяц(?:і|ів)?|міс\.?)(?![\w-])",
         re.IGNORECASE,
     )
+
+    # YEARS_PATTERN and MONTHS_PATTERN in one scan: group 2 is set for years,
+    # group 3 for months. The (?<![\d.]) guard is checked after the first
+    # digit so the scan can skip ahead to digits
+    EXPERIENCE_PATTERN = re.compile(
+        r"(\d(?<![\d.]\d)\d*(?:[.,]\d+)?)\s*(?:\+|plus)?\s*"
+        r"(?:(years?|yrs?|y\.?o\.?|роки?|років|р\.)|(months?|mos?|місяц(?:і|ів)?|міс\.?))(?![\w-])",
+        re.IGNORECASE,
+    )
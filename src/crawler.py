@@ -1,50 +1,257 @@
 import logging
+import shutil
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 
-from scrapy.crawler import CrawlerProcess
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess, CrawlerRunner
 
 from src.config import MainConfig
-from src.scrape.spiders.python_vacancies_spider import PythonVacanciesSpider
+from src.scrape.checkpoint import repair_feed
+from src.scrape.spiders.vacancies_spider import make_vacancies_spider
+from src.storage import get_parquet_path
 
 SPIDERS = {
-    "python": PythonVacanciesSpider,
+    field: make_vacancies_spider(field, category)
+    for field, category in MainConfig.CATEGORIES.items()
 }
 
 logger = logging.getLogger(__name__)
 
 
 def get_csv_output_path(field: str) -> Path:
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    timestamp = datetime.now().strftime(MainConfig.SNAPSHOT_TIME_FORMAT)
     data_dir = MainConfig.DATA_DIR / field / timestamp
     data_dir.mkdir(parents=True, exist_ok=True)
 
     return data_dir / MainConfig.CSV_NAME
 
 
-def get_crawler_settings(output_path: Path) -> dict:
-    settings = MainConfig.CRAWLER_SETTINGS.copy()
-    settings["FEEDS"] = {
-        str(output_path): {
-            "format": "csv",
+def get_snapshot_id(csv_output_path: Path) -> str:
+    snapshot_dir = csv_output_path.parent
+    if snapshot_dir.is_relative_to(MainConfig.DATA_DIR):
+        return snapshot_dir.relative_to(MainConfig.DATA_DIR).as_posix()
+
+    return snapshot_dir.name
+
+
+def get_crawler_settings(
+    output_path: Path,
+    crawlers_count: int = 1,
+    replay_snapshot: str | None = None,
+    extra_settings: dict | None = None,
+    resume: bool = False,
+) -> dict:
+    settings = {**MainConfig.CRAWLER_SETTINGS, **(extra_settings or {})}
+
+    settings["HTTPCACHE_SQLITE_PATH"] = str(MainConfig.DATA_DIR / MainConfig.HTTPCACHE_NAME)
+    settings["HTTPCACHE_SNAPSHOT"] = get_snapshot_id(output_path)
+    if replay_snapshot:
+        # Serve every response from the snapshot's cache entries, never the network
+        settings["HTTPCACHE_REPLAY_SNAPSHOT"] = replay_snapshot
+        settings["HTTPCACHE_POLICY"] = "scrapy.extensions.httpcache.DummyPolicy"
+        settings["HTTPCACHE_IGNORE_MISSING"] = True
+        settings["DOWNLOAD_DELAY"] = 0
+        settings["CONCURRENT_REQUESTS_PER_DOMAIN"] = MainConfig.DOWNLOAD_SLOT_BUDGET
+        settings["ADAPTIVE_THROTTLE_ENABLED"] = False
+
+    # All categories hit the same domain, so parallel crawls split one budget
+    settings["ADAPTIVE_THROTTLE_SHARE"] = 1 / crawlers_count
+    settings["ADAPTIVE_THROTTLE_MAX_CONCURRENCY"] = max(
+        1, MainConfig.DOWNLOAD_SLOT_BUDGET // crawlers_count
+    )
+    settings["DOWNLOAD_DELAY"] *= crawlers_count
+
+    settings["ADAPTIVE_THROTTLE_STATE_PATH"] = str(
+        MainConfig.DATA_DIR / MainConfig.THROTTLE_STATE_NAME
+    )
+    settings["RUN_DIR"] = str(output_path.parent)
+    settings["JOBDIR"] = str(output_path.parent / MainConfig.JOB_DIR_NAME)
+    settings["THROUGHPUT_STATS_PATH"] = str(
+        output_path.parent / MainConfig.THROUGHPUT_STATS_NAME
+    )
+
+    csv_feed = {"format": "csv", "encoding": "utf-8", "overwrite": not resume}
+    if resume and output_path.exists() and output_path.stat().st_size > 0:
+        csv_feed["item_export_kwargs"] = {"include_headers_line": False}
+    settings["FEEDS"] = {str(output_path): csv_feed}
+
+    if resume:
+        # Only the CSV feed can be appended to. The analysis falls back to it
+        # once the partial parquet is gone, and the streaming aggregates would
+        # only cover the resumed part
+        settings["STREAMING_AGGREGATES_ENABLED"] = False
+        return settings
+
+    settings["FEEDS"][str(get_parquet_path(output_path))] = {
+        "format": "parquet",
+        "overwrite": True,
+    }
+
+    archive = settings.get("FEED_ARCHIVE")
+    if archive:
+        if archive not in MainConfig.FEED_ARCHIVES:
+            raise ValueError(
+                f"Unknown feed archive {archive!r}, expected one of {list(MainConfig.FEED_ARCHIVES)}"
+            )
+
+        feed_format, plugin = MainConfig.FEED_ARCHIVES[archive]
+        settings["FEEDS"][str(output_path.with_name(f"raw_data.{archive}"))] = {
+            "format": feed_format,
             "encoding": "utf-8",
             "overwrite": True,
+            "postprocessing": [plugin],
+            "gzip_compresslevel": 6,
         }
-    }
 
     return settings
 
 
-def run_spider(spider_key: str, csv_output_path: Path) -> None:
-    spider_class = SPIDERS.get(spider_key)
+def get_previous_snapshot(field: str, current_output_path: Path) -> Path | None:
+    snapshots = sorted(
+        path
+        for path in (MainConfig.DATA_DIR / field).glob(f"*/{MainConfig.CSV_NAME}")
+        if path != current_output_path and path.stat().st_size > 0
+    )
+
+    return snapshots[-1] if snapshots else None
+
+
+def get_spider_kwargs(field: str, csv_output_path: Path, incremental: bool) -> dict:
+    if not incremental:
+        return {}
+
+    return {
+        "incremental": True,
+        "seen_index_path": MainConfig.DATA_DIR / field / MainConfig.SEEN_INDEX_NAME,
+        "previous_snapshot": get_previous_snapshot(field, csv_output_path),
+    }
+
+
+def prepare_resume(csv_output_path: Path) -> set[str]:
+    run_dir = csv_output_path.parent
+    job_dir = run_dir / MainConfig.JOB_DIR_NAME
+    if job_dir.exists() and not (job_dir / "requests.queue" / "active.json").exists():
+        # The run crashed, so its queue and seen requests were never written
+        # out cleanly. The checkpoint decides what is fetched again
+        logger.warning(f"Discarding the request queue of the crashed run in {job_dir}")
+        shutil.rmtree(job_dir)
+
+    get_parquet_path(csv_output_path).unlink(missing_ok=True)
+    (run_dir / MainConfig.AGGREGATES_NAME).unlink(missing_ok=True)
+
+    return repair_feed(csv_output_path)
+
+
+def get_spider_class(field: str) -> type:
+    spider_class = SPIDERS.get(field)
     if not spider_class:
-        logger.error(f"Spider {spider_key} is not supported")
-        raise ValueError(f"Spider {spider_key} not supported")
+        logger.error(f"Spider {field} is not supported")
+        raise ValueError(f"Spider {field} not supported")
+
+    return spider_class
+
+
+def schedule_crawl(
+    runner: CrawlerRunner,
+    field: str,
+    csv_output_path: Path,
+    incremental: bool = False,
+    crawlers_count: int = 1,
+    on_feed_closed: Callable[[str, Path], None] | None = None,
+    replay_snapshot: str | None = None,
+    extra_settings: dict | None = None,
+    resume: bool = False,
+    on_spider_closed: Callable[[str, Path, str, dict], None] | None = None,
+):
+    spider_class = get_spider_class(field)
+    done_urls = prepare_resume(csv_output_path) if resume else None
+
+    crawler = runner.create_crawler(spider_class)
+    crawler.settings.setdict(
+        get_crawler_settings(
+            csv_output_path, crawlers_count, replay_snapshot, extra_settings, resume
+        ),
+        priority="cmdline",
+    )
+
+    # connected before the feed exporter, so the reason is known when its feeds close
+    finish_reason = {}
+
+    def spider_closed(spider, reason):
+        finish_reason["reason"] = reason
+        if on_spider_closed is not None:
+            on_spider_closed(field, csv_output_path, reason, crawler.stats.get_stats())
+
+    def feed_closed():
+        # The feeds also close when the crawl is stopped. A partial snapshot is
+        # left for --resume, analyzing it would warehouse its partial counts
+        if finish_reason.get("reason") != "finished":
+            logger.warning(
+                f"The {field} crawl did not finish ({finish_reason.get('reason')}), "
+                f"skipping the analysis. Complete it with "
+                f"`main.py run --resume {get_snapshot_id(csv_output_path)}`"
+            )
+            return
+
+        on_feed_closed(field, csv_output_path)
+
+    crawler.signals.connect(spider_closed, signal=signals.spider_closed, weak=False)
+    if on_feed_closed is not None:
+        crawler.signals.connect(feed_closed, signal=signals.feed_exporter_closed, weak=False)
+
+    logger.info(f"Starting spider for {field} vacancies. Saving to {csv_output_path}")
+
+    spider_kwargs = get_spider_kwargs(field, csv_output_path, incremental)
+    if replay_snapshot:
+        spider_kwargs["list_mode"] = "xhr"
+        # keeps the replay out of the warehouse, it observed nothing new
+        (csv_output_path.parent / MainConfig.REPLAY_MARKER_NAME).write_text(
+            replay_snapshot, encoding="utf-8"
+        )
+    if resume:
+        spider_kwargs["done_urls"] = done_urls
+        spider_kwargs["checkpoint_path"] = csv_output_path.parent / MainConfig.CHECKPOINT_NAME
+
+    return runner.crawl(crawler, **spider_kwargs)
+
+
+def run_spiders(
+    fields: list[str],
+    incremental: bool = False,
+    on_feed_closed: Callable[[str, Path], None] | None = None,
+    replay_snapshot: str | None = None,
+    extra_settings: dict | None = None,
+    resume_snapshot: Path | None = None,
+) -> dict[str, Path]:
+    for field in fields:
+        get_spider_class(field)
+
+    if resume_snapshot is not None:
+        output_paths = {field: resume_snapshot for field in fields}
+    else:
+        output_paths = {field: get_csv_output_path(field) for field in fields}
+
+    process = CrawlerProcess(settings=MainConfig.CRAWLER_SETTINGS)
+    for field, output_path in output_paths.items():
+        schedule_crawl(
+            process,
+            field,
+            output_path,
+            incremental=incremental,
+            crawlers_count=len(fields),
+            on_feed_closed=on_feed_closed,
+            replay_snapshot=replay_snapshot,
+            extra_settings=extra_settings,
+            resume=resume_snapshot is not None,
+        )
+    process.start()
 
-    settings = get_crawler_settings(csv_output_path)
+    return output_paths
 
-    logger.info(f"Starting spider for {spider_key} vacancies. Saving to {csv_output_path}")
 
-    process = CrawlerProcess(settings=settings)
-    process.crawl(spider_class)
+def run_spider(spider_key: str, csv_output_path: Path, incremental: bool = False) -> None:
+    process = CrawlerProcess(settings=MainConfig.CRAWLER_SETTINGS)
+    schedule_crawl(process, spider_key, csv_output_path, incremental=incremental)
     process.start()
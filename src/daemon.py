@@ -0,0 +1,371 @@
+import json
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from pathlib import Path
+
+from src.config import MainConfig
+from src.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# name, lowest and highest value; weekday 7 is Sunday, like 0
+CRON_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> list[int]:
+    values = set()
+    for part in field.split(","):
+        span, _, step = part.partition("/")
+        if span == "*":
+            start, stop = low, high
+        elif "-" in span:
+            start, stop = (int(value) for value in span.split("-", 1))
+        else:
+            start = int(span)
+            stop = high if step else start
+
+        step = int(step) if step else 1
+        if not low <= start <= stop <= high or step < 1:
+            raise ValueError(f"{part!r} is outside {low}-{high}")
+        values.update(range(start, stop + 1, step))
+
+    return sorted(values)
+
+
+class CronSchedule:
+    # "minute hour day month weekday" with *, lists, ranges and /steps.
+    # As in cron, when both day and weekday are restricted either one matches
+
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != len(CRON_FIELDS):
+            raise ValueError(f"Cron spec {spec!r} needs 5 fields: minute hour day month weekday")
+
+        try:
+            minutes, hours, days, months, weekdays = (
+                _parse_cron_field(field, low, high)
+                for field, (_, low, high) in zip(fields, CRON_FIELDS)
+            )
+        except ValueError as e:
+            raise ValueError(f"Bad cron spec {spec!r}: {e}") from e
+
+        self.spec = spec
+        self.minutes = minutes
+        self.hours = hours
+        self.days = set(days)
+        self.months = set(months)
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2].startswith("*") or fields[4].startswith("*")
+
+    def _day_matches(self, day) -> bool:
+        if day.month not in self.months:
+            return False
+
+        day_matches = day.day in self.days
+        # cron counts weekdays from Sunday, Python from Monday
+        weekday_matches = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return day_matches and weekday_matches
+
+        return day_matches or weekday_matches
+
+    def next_after(self, moment: datetime) -> datetime:
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+
+        # February 29th on a given weekday comes round every 28 years
+        for _ in range(366 * 28):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime(day.year, day.month, day.day, hour, minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+
+        raise ValueError(f"Cron spec {self.spec!r} never matches")
+
+
+def _warm_up() -> None:
+    # imports pandas, matplotlib and the analysis in the worker before the first crawl ends
+    import src.analysis.data_processing_orchestrator  # noqa: F401
+
+
+def _failed(run: dict | None) -> bool:
+    if not run:
+        return False
+
+    return (
+        "error" in run
+        or run.get("finish_reason", "finished") != "finished"
+        or run.get("analysis") == "failed"
+    )
+
+
+class CrawlDaemon:
+    # Crawls every field on its schedule in one long-running process, so
+    # imports, compiled patterns, the HTTP cache connection and the browser
+    # pool stay warm between runs. Each snapshot is analyzed in a persistent
+    # worker process as soon as its feed closes
+
+    def __init__(
+        self,
+        runner,
+        schedules: dict[str, CronSchedule],
+        analyze: Callable[..., None],
+        analysis_kwargs: dict,
+        incremental: bool = True,
+        extra_settings: dict | None = None,
+        jitter: float = MainConfig.DAEMON_JITTER,
+        max_crawls: int = MainConfig.DAEMON_MAX_CRAWLS,
+        analysis_workers: int = MainConfig.DAEMON_ANALYSIS_WORKERS,
+    ):
+        self.runner = runner
+        self.schedules = schedules
+        self.analyze = analyze
+        self.analysis_kwargs = analysis_kwargs
+        self.incremental = incremental
+        self.extra_settings = extra_settings
+        self.jitter = jitter
+        self.max_crawls = max_crawls
+
+        # spawn keeps the Twisted reactor threads out of the analysis workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=analysis_workers, mp_context=get_context("spawn"), initializer=setup_logging
+        )
+
+        self.queue: deque[str] = deque()
+        self.crawling: dict[str, dict] = {}
+        self.crawl_started: dict[str, float] = {}
+        self.analyses = {}
+        self.calls = {}
+        self.fields = {
+            field: {"runs": 0, "failures": 0, "skipped": 0, "next_run": None, "last_run": None}
+            for field in schedules
+        }
+        self.started = time.time()
+
+    def start(self, run_now: bool = False) -> None:
+        self.executor.submit(_warm_up)
+
+        for field, schedule in self.schedules.items():
+            logger.info(f"Crawling {field} on {schedule.spec!r} with up to {self.jitter:.0f}s jitter")
+            if run_now:
+                self.enqueue(field)
+            else:
+                self.schedule_next(field)
+
+    def schedule_next(self, field: str) -> None:
+        from twisted.internet import reactor
+
+        now = datetime.now()
+        delay = (self.schedules[field].next_after(now) - now).total_seconds()
+        # spread crawls sharing a spec, and the daemon's requests, around the exact minute
+        delay += random.uniform(0, self.jitter)
+
+        self.fields[field]["next_run"] = (now + timedelta(seconds=delay)).isoformat(timespec="seconds")
+        self.calls[field] = reactor.callLater(delay, self.enqueue, field)
+        logger.info(f"Next {field} crawl at {self.fields[field]['next_run']}")
+
+    def enqueue(self, field: str) -> None:
+        self.schedule_next(field)
+
+        if field in self.queue or field in self.crawling:
+            self.fields[field]["skipped"] += 1
+            logger.warning(f"The previous {field} crawl has not finished, skipping this one")
+            return
+
+        self.queue.append(field)
+        self._start_crawls()
+
+    def _start_crawls(self) -> None:
+        while self.queue and len(self.crawling) < self.max_crawls:
+            self._crawl(self.queue.popleft())
+
+    def _crawl(self, field: str) -> None:
+        from twisted.internet.defer import maybeDeferred
+
+        from src.crawler import get_csv_output_path, get_snapshot_id, schedule_crawl
+
+        output_path = get_csv_output_path(field)
+        self.crawling[field] = {
+            "snapshot": get_snapshot_id(output_path),
+            "started": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.crawl_started[field] = time.perf_counter()
+
+        deferred = maybeDeferred(
+            schedule_crawl,
+            self.runner,
+            field,
+            output_path,
+            incremental=self.incremental,
+            crawlers_count=self.max_crawls,
+            on_feed_closed=self._analyze,
+            extra_settings=self.extra_settings,
+            on_spider_closed=self._crawl_closed,
+        )
+        deferred.addErrback(self._crawl_failed, field)
+        deferred.addBoth(self._crawl_done, field)
+
+    def _crawl_closed(self, field: str, output_path: Path, reason: str, stats: dict) -> None:
+        run = self.crawling[field]
+        run["crawl_seconds"] = round(time.perf_counter() - self.crawl_started[field], 1)
+        run["finish_reason"] = reason
+        run["items"] = stats.get("item_scraped_count", 0)
+
+    def _crawl_failed(self, failure, field: str) -> None:
+        logger.error(f"Crawl of {field} failed: {failure.getTraceback()}")
+        self.crawling[field]["error"] = failure.getErrorMessage()
+
+    def _crawl_done(self, _, field: str) -> None:
+        run = self.crawling.pop(field)
+        # schedule_crawl only analyzes the feeds of finished crawls
+        run.setdefault("analysis", "skipped")
+        state = self.fields[field]
+        state["runs"] += 1
+        state["last_run"] = run
+        if _failed(run):
+            state["failures"] += 1
+
+        logger.info(f"Crawl of {field} done: {json.dumps(run)}")
+        self._start_crawls()
+
+    def _analyze(self, field: str, output_path: Path) -> None:
+        from src.scrape.spiders.vacancies_spider import future_to_deferred
+
+        run = self.crawling.get(field, {})
+        run["analysis"] = "running"
+        started = time.perf_counter()
+        logger.info(f"Feed for {field} closed. Starting analysis of {output_path}")
+
+        def finished(result, status: str) -> None:
+            del self.analyses[output_path]
+            run["analysis"] = status
+            run["analysis_seconds"] = round(time.perf_counter() - started, 1)
+            if status == "failed":
+                logger.error(f"Analysis of {output_path} failed: {result.getTraceback()}")
+                if self.fields[field]["last_run"] is run:
+                    self.fields[field]["failures"] += 1
+
+        future = self.executor.submit(self.analyze, output_path, **self.analysis_kwargs)
+        self.analyses[output_path] = future_to_deferred(future)
+        self.analyses[output_path].addCallbacks(
+            finished, finished, callbackArgs=("finished",), errbackArgs=("failed",)
+        )
+
+    def health(self) -> tuple[int, dict]:
+        failing = sorted(field for field, state in self.fields.items() if _failed(state["last_run"]))
+        if failing:
+            return 503, {"status": "failing", "fields": failing}
+
+        return 200, {"status": "ok"}
+
+    def status(self) -> dict:
+        return {
+            **self.health()[1],
+            "uptime_seconds": round(time.time() - self.started),
+            "queue_depth": len(self.queue),
+            "queued": list(self.queue),
+            "crawling": self.crawling,
+            "analyses_running": len(self.analyses),
+            "fields": {
+                field: {"schedule": schedule.spec, **self.fields[field]}
+                for field, schedule in self.schedules.items()
+            },
+        }
+
+    def stop(self):
+        from twisted.internet.defer import DeferredList
+        from twisted.internet.threads import deferToThread
+
+        for call in self.calls.values():
+            if call.active():
+                call.cancel()
+
+        for field, run in self.crawling.items():
+            logger.info(
+                f"Stopping the {field} crawl, finish it later with "
+                f"`main.py run --resume {run['snapshot']}`"
+            )
+
+        def wait_for_analyses(_):
+            # the reactor keeps running meanwhile, the workers report back through it
+            if self.analyses:
+                logger.info(f"Waiting for {len(self.analyses)} analyses to finish")
+            return DeferredList(list(self.analyses.values()))
+
+        def shut_down(_):
+            # the workers are idle by now, joining them still happens off the reactor thread
+            return deferToThread(self.executor.shutdown)
+
+        return self.runner.stop().addBoth(wait_for_analyses).addBoth(shut_down)
+
+
+def status_site(daemon: CrawlDaemon):
+    from twisted.web.resource import Resource
+    from twisted.web.server import Site
+
+    class StatusResource(Resource):
+        isLeaf = True
+
+        def render_GET(self, request):
+            path = request.path.decode().rstrip("/")
+            if path == "/health":
+                code, body = daemon.health()
+            elif path in ("", "/status"):
+                code, body = 200, daemon.status()
+            else:
+                code, body = 404, {"error": f"no such page {path}, try /status or /health"}
+
+            request.setResponseCode(code)
+            request.setHeader(b"content-type", b"application/json")
+            return json.dumps(body, indent=1).encode("utf-8")
+
+    return Site(StatusResource())
+
+
+def run_daemon(
+    fields: list[str],
+    analyze: Callable[..., None],
+    analysis_kwargs: dict,
+    schedules: dict[str, str] | None = None,
+    incremental: bool = True,
+    extra_settings: dict | None = None,
+    jitter: float = MainConfig.DAEMON_JITTER,
+    port: int = MainConfig.DAEMON_STATUS_PORT,
+    run_now: bool = False,
+) -> None:
+    from scrapy.settings import Settings
+    from scrapy.utils.reactor import install_reactor
+
+    # CrawlerRunner leaves the reactor to us; install the one the crawls expect
+    settings = Settings(MainConfig.CRAWLER_SETTINGS)
+    install_reactor(settings["TWISTED_REACTOR"], settings["ASYNCIO_EVENT_LOOP"])
+
+    from scrapy.crawler import CrawlerRunner
+    from twisted.internet import reactor
+
+    schedules = {**MainConfig.DAEMON_SCHEDULES, **(schedules or {})}
+    daemon = CrawlDaemon(
+        CrawlerRunner(MainConfig.CRAWLER_SETTINGS),
+        {field: CronSchedule(schedules.get(field, MainConfig.DAEMON_SCHEDULE)) for field in fields},
+        analyze,
+        analysis_kwargs,
+        incremental=incremental,
+        extra_settings=extra_settings,
+        jitter=jitter,
+    )
+
+    reactor.listenTCP(port, status_site(daemon), interface="127.0.0.1")
+    logger.info(f"Daemon status on http://127.0.0.1:{port}/status")
+
+    reactor.addSystemEventTrigger("before", "shutdown", daemon.stop)
+    reactor.callWhenRunning(daemon.start, run_now)
+    reactor.run()
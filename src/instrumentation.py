@@ -0,0 +1,140 @@
+import cProfile
+import json
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.config import MainConfig
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class Metrics:
+    # Stage timers and counters for one crawl or one analysis
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.timings: dict[str, list[float]] = defaultdict(list)
+        self.counters: Counter = Counter()
+
+    def observe(self, name: str, seconds: float) -> None:
+        self.timings[name].append(seconds)
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def summary(self) -> dict:
+        return {
+            "timers": {
+                name: {
+                    "count": len(values),
+                    "total_seconds": round(sum(values), 6),
+                    "max_seconds": round(max(values), 6),
+                }
+                for name, values in sorted(self.timings.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+# the process-wide instance used by the analysis stages
+METRICS = Metrics()
+timer = METRICS.timer
+incr = METRICS.incr
+
+
+def write_metrics(run_dir: Path, section: str, metrics: Metrics, extra: dict | None = None) -> Path:
+    # the crawl and the analysis run in different processes, so each section
+    # gets a file of its own instead of a read-modify-write of a shared one
+    path = run_dir / f"{section}_{MainConfig.METRICS_NAME}"
+    data = {**metrics.summary(), **(extra or {})}
+
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+    tmp_path.replace(path)
+
+    logger.info(f"Saved {section} metrics to {path}")
+    return path
+
+
+def write_prometheus(run_dir: Path, section: str, metrics: Metrics, field: str) -> Path | None:
+    try:
+        from prometheus_client import CollectorRegistry, Gauge, write_to_textfile
+    except ImportError:
+        logger.warning("prometheus_client is not installed, skipping the Prometheus text file")
+        return None
+
+    registry = CollectorRegistry()
+    labels = ["field", "stage"]
+    seconds = Gauge(
+        f"dou_{section}_stage_seconds", "Total time spent in a stage", labels, registry=registry
+    )
+    calls = Gauge(
+        f"dou_{section}_stage_calls", "Number of timed calls of a stage", labels, registry=registry
+    )
+    counters = Gauge(
+        f"dou_{section}_count", "Counters recorded during the run", ["field", "name"],
+        registry=registry,
+    )
+
+    for name, values in metrics.timings.items():
+        seconds.labels(field, name).set(sum(values))
+        calls.labels(field, name).set(len(values))
+    for name, value in metrics.counters.items():
+        counters.labels(field, name).set(value)
+
+    path = run_dir / f"{section}_{MainConfig.PROMETHEUS_NAME}"
+    write_to_textfile(str(path), registry)
+
+    logger.info(f"Saved Prometheus metrics to {path}")
+    return path
+
+
+@contextmanager
+def profiled(path: Path, profiler: str | None):
+    if not profiler:
+        yield
+        return
+
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r}, expected one of {PROFILERS}")
+
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed, profiling with cProfile")
+        else:
+            instrument = Profiler()
+            instrument.start()
+            try:
+                yield
+            finally:
+                instrument.stop()
+                path.with_suffix(".html").write_text(instrument.output_html(), encoding="utf-8")
+                logger.info(f"Saved profile to {path.with_suffix('.html')}")
+            return
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        logger.info(f"Saved profile to {path}")
@@ -1,4 +1,4 @@
-import logging
+import logging.config
 
 from src.config import MainConfig
 
@@ -0,0 +1,217 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import psutil
+from scrapy import signals
+from scrapy.http import HtmlResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet.defer import DeferredSemaphore
+from twisted.internet.threads import deferToThread
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+]
+
+
+class PooledBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+    def memory_mb(self) -> float:
+        # chromedriver plus every Chrome process it started
+        try:
+            service = psutil.Process(self.driver.service.process.pid)
+            processes = [service, *service.children(recursive=True)]
+            return sum(p.memory_info().rss for p in processes) / 2 ** 20
+        except (AttributeError, psutil.Error):
+            return 0.0
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Could not quit browser cleanly: {e}")
+
+
+class BrowserPool:
+    # Warm headless Chrome instances, each leased to one render at a time and
+    # replaced after max_uses renders or once it grows past memory_limit_mb.
+    # At most size renders hold a slot at once, whichever crawl they come from
+
+    def __init__(
+        self,
+        size: int,
+        max_uses: int,
+        memory_limit_mb: int,
+        page_load_timeout: float,
+        blocked_resources: list[str],
+    ):
+        self.max_uses = max_uses
+        self.memory_limit_mb = memory_limit_mb
+        self.page_load_timeout = page_load_timeout
+        self.blocked_resources = blocked_resources
+        self.slots = DeferredSemaphore(size)
+        self.idle: deque[PooledBrowser] = deque()
+        self.leased: set[PooledBrowser] = set()
+        self.lock = threading.Lock()
+        self.launched = 0
+        self.recycled = 0
+
+    def _launch(self) -> PooledBrowser:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-dev-shm-usage")
+        # V8 heap of each tab, the per-browser total is enforced by recycling
+        options.add_argument(f"--js-flags=--max-old-space-size={self.memory_limit_mb // 2}")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        if self.blocked_resources:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_resources})
+
+        self.launched += 1
+        logger.info(f"Launched browser #{self.launched}")
+        return PooledBrowser(driver)
+
+    def acquire(self) -> PooledBrowser:
+        with self.lock:
+            browser = self.idle.popleft() if self.idle else None
+        if browser is None:
+            browser = self._launch()
+
+        with self.lock:
+            self.leased.add(browser)
+        return browser
+
+    def release(self, browser: PooledBrowser, broken: bool = False) -> None:
+        browser.uses += 1
+        with self.lock:
+            self.leased.discard(browser)
+
+        memory = browser.memory_mb()
+        if broken or browser.uses >= self.max_uses or memory > self.memory_limit_mb:
+            logger.info(
+                f"Recycling browser after {browser.uses} uses at {memory:.0f} MiB"
+                + (" (broken)" if broken else "")
+            )
+            self.recycled += 1
+            browser.quit()
+            return
+
+        with self.lock:
+            self.idle.append(browser)
+
+    def close(self) -> None:
+        with self.lock:
+            browsers = [*self.idle, *self.leased]
+            self.idle.clear()
+            self.leased.clear()
+
+        for browser in browsers:
+            browser.quit()
+
+
+_shared_pool: BrowserPool | None = None
+
+
+def shared_pool(**options) -> BrowserPool:
+    # One pool for every crawl of the process, e.g. each category of a run,
+    # built with the options of the first. Closed when the reactor shuts down
+    global _shared_pool
+    if _shared_pool is None:
+        from twisted.internet import reactor
+
+        _shared_pool = BrowserPool(**options)
+        reactor.addSystemEventTrigger("before", "shutdown", deferToThread, close_shared_pool)
+
+    return _shared_pool
+
+
+def close_shared_pool() -> None:
+    global _shared_pool
+    if _shared_pool is not None:
+        _shared_pool.close()
+        _shared_pool = None
+
+
+class BrowserPoolMiddleware:
+    # Renders requests flagged with meta["render_js"] in a pooled browser.
+    # meta["browser_action"] names a spider method called with the driver
+    # after the page loads, e.g. to click through "More" buttons.
+    # Everything else goes to the regular downloader untouched.
+
+    def __init__(self, crawler, pool: BrowserPool):
+        self.crawler = crawler
+        self.pool = pool
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        pool = shared_pool(
+            size=settings.getint("BROWSER_POOL_SIZE"),
+            max_uses=settings.getint("BROWSER_POOL_MAX_USES"),
+            memory_limit_mb=settings.getint("BROWSER_POOL_MEMORY_LIMIT_MB"),
+            page_load_timeout=settings.getfloat("BROWSER_POOL_PAGE_LOAD_TIMEOUT"),
+            blocked_resources=settings.getlist(
+                "BROWSER_POOL_BLOCKED_RESOURCES", BLOCKED_RESOURCES
+            ),
+        )
+
+        middleware = cls(crawler, pool)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    async def process_request(self, request, spider):
+        if not request.meta.get("render_js"):
+            return None
+
+        await maybe_deferred_to_future(self.pool.slots.acquire())
+        try:
+            start = time.perf_counter()
+            url, body = await maybe_deferred_to_future(
+                deferToThread(self._render, request.url, request.meta.get("browser_action"), spider)
+            )
+        finally:
+            self.pool.slots.release()
+
+        if hasattr(spider, "metrics"):
+            spider.metrics.observe("render_js", time.perf_counter() - start)
+        self.crawler.stats.inc_value("browser_pool/renders")
+
+        return HtmlResponse(
+            url=url, body=body, encoding="utf-8", request=request, flags=["render_js"]
+        )
+
+    def _render(self, url: str, action: str | None, spider) -> tuple[str, bytes]:
+        browser = self.pool.acquire()
+        broken = True
+        try:
+            browser.driver.get(url)
+            if action:
+                getattr(spider, action)(browser.driver)
+
+            result = browser.driver.current_url, browser.driver.page_source.encode("utf-8")
+            broken = False
+            return result
+        finally:
+            self.pool.release(browser, broken=broken)
+
+    def spider_closed(self, spider):
+        # the pool outlives the crawl, so these count the whole process so far
+        self.crawler.stats.set_value("browser_pool/launched", self.pool.launched)
+        self.crawler.stats.set_value("browser_pool/recycled", self.pool.recycled)
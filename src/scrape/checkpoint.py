@@ -0,0 +1,59 @@
+import csv
+import json
+import logging
+import os
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def load_checkpoint(path: Path) -> dict:
+    if not path.exists():
+        return {"discovered": [], "list_complete": False}
+
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_checkpoint(path: Path, discovered: Iterable[str], list_complete: bool) -> None:
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(
+        json.dumps({"discovered": sorted(discovered), "list_complete": list_complete}, indent=1),
+        encoding="utf-8",
+    )
+    tmp_path.replace(path)
+
+
+def repair_feed(csv_path: Path) -> set[str]:
+    # A crash can leave the last row of the CSV feed half written. Complete
+    # rows end with the csv module's \r\n (descriptions have their whitespace
+    # collapsed), so a feed that does not is rewritten without its last row.
+    # Returns the urls the feed already holds.
+    if not csv_path.exists() or csv_path.stat().st_size == 0:
+        return set()
+
+    csv.field_size_limit(sys.maxsize)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header, *rows = list(csv.reader(f))
+
+    with open(csv_path, "rb") as f:
+        f.seek(-2, os.SEEK_END)
+        complete = f.read() == b"\r\n"
+
+    if "url" not in header or not (rows or complete):
+        # died while writing the header, start the feed over
+        csv_path.unlink()
+        return set()
+
+    if not complete:
+        logger.warning(f"Dropping the unfinished last row of {csv_path}")
+        rows = rows[:-1]
+
+        tmp_path = csv_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([header, *rows])
+        tmp_path.replace(csv_path)
+
+    url_index = header.index("url")
+    return {row[url_index] for row in rows if len(row) > url_index and row[url_index]}
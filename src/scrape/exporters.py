@@ -0,0 +1,65 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+from itemadapter import ItemAdapter
+from scrapy.exporters import BaseItemExporter
+
+from src.storage import RAW_SCHEMA, to_float
+
+
+class ParquetItemExporter(BaseItemExporter):
+    # Buffers items column-wise and writes a row group every ROW_GROUP_SIZE
+    # items, using the explicit raw schema
+
+    ROW_GROUP_SIZE = 1000
+
+    def __init__(self, file, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        self.file = file
+        self.schema = RAW_SCHEMA
+        if self.fields_to_export:
+            self.schema = pa.schema(
+                [RAW_SCHEMA.field(name) for name in self.fields_to_export]
+            )
+
+        self.writer = None
+        self._reset_buffer()
+
+    def _reset_buffer(self):
+        self.buffer = {name: [] for name in self.schema.names}
+        self.buffered = 0
+
+    def start_exporting(self):
+        self.writer = pq.ParquetWriter(self.file, self.schema)
+
+    def export_item(self, item):
+        adapter = ItemAdapter(item)
+        for name in self.schema.names:
+            self.buffer[name].append(self._convert(name, adapter.get(name)))
+
+        self.buffered += 1
+        if self.buffered >= self.ROW_GROUP_SIZE:
+            self._flush()
+
+    def finish_exporting(self):
+        self._flush()
+        self.writer.close()
+
+    def _flush(self):
+        if not self.buffered:
+            return
+
+        self.writer.write_table(pa.table(self.buffer, schema=self.schema))
+        self._reset_buffer()
+
+    @staticmethod
+    def _convert(name, value):
+        if isinstance(value, list):
+            value = ",".join(value)
+
+        if value is None or value == "":
+            return None
+
+        if name == "experience_years":
+            return to_float(value)
+
+        return str(value)
@@ -0,0 +1,403 @@
+# Define here your scrapy extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import json
+import logging
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet.task import LoopingCall
+
+from src.config import MainConfig
+from src.instrumentation import Metrics, write_metrics, write_prometheus
+from src.scrape.checkpoint import load_checkpoint, save_checkpoint
+
+logger = logging.getLogger(__name__)
+
+
+class ReactorLagMonitor:
+    # Schedules a tick every REACTOR_LAG_INTERVAL seconds and records how late
+    # it fires, i.e. how long callbacks held the event loop
+
+    def __init__(self, crawler, interval: float):
+        self.crawler = crawler
+        self.interval = interval
+        self.task = None
+        self.last_tick = None
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        interval = crawler.settings.getfloat("REACTOR_LAG_INTERVAL")
+        if interval <= 0:
+            raise NotConfigured
+
+        ext = cls(crawler, interval)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.last_tick = time.perf_counter()
+        self.task = LoopingCall(self._tick)
+        self.task.start(self.interval, now=False)
+
+    def _tick(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self.last_tick - self.interval)
+        self.last_tick = now
+
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def spider_closed(self, spider):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+
+        if not self.samples:
+            return
+
+        mean_lag_ms = self.total_lag / self.samples * 1000
+        max_lag_ms = self.max_lag * 1000
+
+        stats = self.crawler.stats
+        stats.set_value("reactor_lag/samples", self.samples)
+        stats.set_value("reactor_lag/mean_ms", round(mean_lag_ms, 3))
+        stats.set_value("reactor_lag/max_ms", round(max_lag_ms, 3))
+
+        logger.info(
+            f"Reactor lag for {spider.name}: mean {mean_lag_ms:.2f} ms, "
+            f"max {max_lag_ms:.2f} ms over {self.samples} ticks"
+        )
+
+
+class AdaptiveThrottle:
+    # Starts from the crawl's DOWNLOAD_DELAY and CONCURRENT_REQUESTS_PER_DOMAIN
+    # (or the rate learned by previous runs) and, every ADAPTIVE_THROTTLE_WINDOW
+    # responses, first shortens the delay and then adds concurrency while
+    # latency stays under the target and nothing failed. 429/5xx responses
+    # halve the concurrency, double the delay and honour Retry-After.
+    #
+    # The learned rate is stored for the whole domain; a crawl that runs next
+    # to others only gets its ADAPTIVE_THROTTLE_SHARE of it.
+
+    BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.share = settings.getfloat("ADAPTIVE_THROTTLE_SHARE", 1.0)
+        self.target_latency = settings.getfloat("ADAPTIVE_THROTTLE_TARGET_LATENCY")
+        self.max_concurrency = settings.getint("ADAPTIVE_THROTTLE_MAX_CONCURRENCY")
+        self.min_delay = settings.getfloat("ADAPTIVE_THROTTLE_MIN_DELAY") / self.share
+        self.max_delay = settings.getfloat("ADAPTIVE_THROTTLE_MAX_DELAY")
+        self.window = deque(maxlen=settings.getint("ADAPTIVE_THROTTLE_WINDOW"))
+        self.state_path = settings.get("ADAPTIVE_THROTTLE_STATE_PATH")
+
+        self.state = {}
+        self.slots = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("ADAPTIVE_THROTTLE_ENABLED"):
+            raise NotConfigured
+
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(
+            ext.response_downloaded, signal=signals.response_downloaded
+        )
+        return ext
+
+    def spider_opened(self, spider):
+        if self.state_path and Path(self.state_path).exists():
+            self.state = json.loads(Path(self.state_path).read_text(encoding="utf-8"))
+
+        settings = self.crawler.settings
+        logger.info(
+            f"Throttling for {spider.name}: start concurrency "
+            f"{settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN')}, start delay "
+            f"{settings.getfloat('DOWNLOAD_DELAY')}s, concurrency up to "
+            f"{self.max_concurrency}, delay {self.min_delay:.2f}-{self.max_delay}s, "
+            f"target latency {self.target_latency}s, learned rates {self.state or 'none'}"
+        )
+
+    def response_downloaded(self, response, request, spider):
+        key = request.meta.get("download_slot")
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is None:
+            return
+
+        if key not in self.slots:
+            self.slots[key] = slot
+            self._apply_learned_rate(key, slot)
+
+        if response.status in self.BACKOFF_STATUSES:
+            self._back_off(key, slot, response)
+            return
+
+        self.window.append(request.meta.get("download_latency", 0.0))
+        if len(self.window) < self.window.maxlen:
+            return
+
+        mean_latency = sum(self.window) / len(self.window)
+        self.window.clear()
+
+        if mean_latency > 2 * self.target_latency:
+            slot.delay = min(self.max_delay, slot.delay * 1.5)
+            slot.concurrency = max(1, slot.concurrency - 1)
+        elif mean_latency < self.target_latency:
+            if slot.delay > self.min_delay:
+                slot.delay = max(self.min_delay, slot.delay * 0.75)
+            elif slot.concurrency < self.max_concurrency:
+                slot.concurrency += 1
+        else:
+            return
+
+        logger.debug(
+            f"Slot {key}: latency {mean_latency:.2f}s -> "
+            f"concurrency {slot.concurrency}, delay {slot.delay:.2f}s"
+        )
+
+    def _apply_learned_rate(self, key, slot):
+        learned = self.state.get(key)
+        if not learned:
+            return
+
+        slot.concurrency = min(
+            self.max_concurrency, max(1, round(learned["concurrency"] * self.share))
+        )
+        slot.delay = min(self.max_delay, max(self.min_delay, learned["delay"] / self.share))
+
+    def _back_off(self, key, slot, response):
+        self.window.clear()
+        slot.concurrency = max(1, slot.concurrency // 2)
+        slot.delay = min(self.max_delay, max(self.min_delay, slot.delay * 2))
+
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            slot.delay = max(slot.delay, retry_after)
+            self.crawler.stats.inc_value("adaptive_throttle/retry_after")
+
+        self.crawler.stats.inc_value("adaptive_throttle/backoff")
+        logger.warning(
+            f"Got {response.status} from {key}, backing off to concurrency "
+            f"{slot.concurrency}, delay {slot.delay:.2f}s"
+        )
+
+    @staticmethod
+    def _retry_after(response) -> float | None:
+        value = response.headers.get(b"Retry-After")
+        if not value:
+            return None
+
+        value = value.decode("latin-1").strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def spider_closed(self, spider):
+        stats = self.crawler.stats
+        for key, slot in self.slots.items():
+            stats.set_value(f"adaptive_throttle/{key}/concurrency", slot.concurrency)
+            stats.set_value(f"adaptive_throttle/{key}/delay", round(slot.delay, 3))
+
+            self.state[key] = {
+                "concurrency": slot.concurrency / self.share,
+                "delay": slot.delay * self.share,
+            }
+
+        if self.state_path and self.slots:
+            path = Path(self.state_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.state, indent=1), encoding="utf-8")
+            logger.info(f"Saved learned crawl rates to {path}")
+
+
+class ThroughputStats:
+    # Writes per-run crawl throughput next to the feed
+
+    def __init__(self, crawler, path: Path):
+        self.crawler = crawler
+        self.path = path
+        self.started = None
+        self.statuses = Counter()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("THROUGHPUT_STATS_PATH")
+        if not path:
+            raise NotConfigured
+
+        ext = cls(crawler, Path(path))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(
+            ext.response_received, signal=signals.response_received
+        )
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.perf_counter()
+
+    def response_received(self, response, request, spider):
+        self.statuses[response.status] += 1
+
+    def spider_closed(self, spider, reason):
+        elapsed = time.perf_counter() - self.started
+        stats = self.crawler.stats.get_stats()
+
+        items = stats.get("item_scraped_count", 0)
+        responses = sum(self.statuses.values())
+
+        throughput = {
+            "spider": spider.name,
+            "finish_reason": reason,
+            "elapsed_seconds": round(elapsed, 3),
+            "items": items,
+            "responses": responses,
+            "items_per_second": round(items / elapsed, 3) if elapsed else None,
+            "responses_per_second": round(responses / elapsed, 3) if elapsed else None,
+            "response_statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "throttle": {
+                key.removeprefix("adaptive_throttle/"): value
+                for key, value in stats.items()
+                if key.startswith("adaptive_throttle/")
+            },
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(throughput, indent=2), encoding="utf-8")
+        logger.info(
+            f"{spider.name}: {items} items in {elapsed:.1f}s "
+            f"({throughput['items_per_second']} items/s). Saved to {self.path}"
+        )
+
+
+class RunMetrics:
+    # Merges the spider's stage timers with the scrapy stats into the run's
+    # crawl_metrics.json and times every download by callback
+
+    def __init__(self, crawler, run_dir: Path, prometheus: bool):
+        self.crawler = crawler
+        self.run_dir = run_dir
+        self.prometheus = prometheus
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        run_dir = crawler.settings.get("RUN_DIR")
+        if not run_dir:
+            raise NotConfigured
+
+        ext = cls(
+            crawler, Path(run_dir), crawler.settings.getbool("METRICS_PROMETHEUS_ENABLED")
+        )
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(
+            ext.response_received, signal=signals.response_received
+        )
+        return ext
+
+    def response_received(self, response, request, spider):
+        latency = request.meta.get("download_latency")
+        if latency is None or not hasattr(spider, "metrics"):
+            return
+
+        callback = getattr(request.callback, "__name__", "parse")
+        spider.metrics.observe(f"download.{callback}", latency)
+
+    def spider_closed(self, spider, reason):
+        metrics = getattr(spider, "metrics", None) or Metrics()
+
+        write_metrics(
+            self.run_dir,
+            "crawl",
+            metrics,
+            extra={"finish_reason": reason, "scrapy": self.crawler.stats.get_stats()},
+        )
+        if self.prometheus:
+            write_prometheus(self.run_dir, "crawl", metrics, field=self.run_dir.parent.name)
+
+
+class CrawlCheckpoint:
+    # Every CHECKPOINT_INTERVAL seconds records the detail pages scheduled so
+    # far and whether the vacancy list was read to the end. JOBDIR only keeps
+    # the request queue across a clean shutdown; after a crash --resume uses
+    # this list to fetch the pages missing from the feed.
+
+    def __init__(self, crawler, path: Path, interval: float, job_dir: Path | None = None):
+        self.crawler = crawler
+        self.path = path
+        self.job_dir = job_dir
+        self.interval = interval
+        self.task = None
+        self.discovered: set[str] = set()
+        self.saved_count = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        interval = crawler.settings.getfloat("CHECKPOINT_INTERVAL")
+        run_dir = crawler.settings.get("RUN_DIR")
+        if interval <= 0 or not run_dir:
+            raise NotConfigured
+
+        job_dir = crawler.settings.get("JOBDIR")
+        ext = cls(
+            crawler,
+            Path(run_dir) / MainConfig.CHECKPOINT_NAME,
+            interval,
+            Path(job_dir) if job_dir else None,
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        return ext
+
+    def spider_opened(self, spider):
+        if self.job_dir is not None:
+            # The scheduler has read its queue state by now and writes it
+            # back only on a clean close, so a missing state file tells the
+            # next --resume that this run crashed
+            (self.job_dir / "requests.queue" / "active.json").unlink(missing_ok=True)
+
+        # a resumed crawl keeps what the crashed one had found
+        self.discovered = set(load_checkpoint(self.path)["discovered"])
+        self.task = LoopingCall(self._save, spider)
+        self.task.start(self.interval, now=False)
+
+    def request_scheduled(self, request, spider):
+        if getattr(request.callback, "__name__", None) == "parse_single_vacancy":
+            self.discovered.add(request.url)
+
+    def _save(self, spider, force: bool = False):
+        list_complete = getattr(spider, "list_complete", False)
+        if not force and self.saved_count == (len(self.discovered), list_complete):
+            return
+
+        save_checkpoint(self.path, self.discovered, list_complete)
+        self.saved_count = (len(self.discovered), list_complete)
+        logger.debug(f"Checkpointed {len(self.discovered)} vacancy urls to {self.path}")
+
+    def spider_closed(self, spider, reason):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+
+        self._save(spider, force=True)
+        self.crawler.stats.set_value("checkpoint/discovered", len(self.discovered))
@@ -0,0 +1,110 @@
+import re
+from collections import defaultdict
+
+from lxml import etree
+from parsel.csstranslator import css2xpath
+from scrapy.http import Response
+
+from src.scrape.items import clean_salary, first_text
+
+# Fields of a DOU vacancy page: the CSS query and how its first
+# non-empty match is cleaned
+DETAIL_FIELDS = {
+    "name": (".g-h2::text", str.strip),
+    "company_name": (".b-compinfo .info .l-n a::text", str.strip),
+    "company_url": (".b-compinfo .info .l-n a::attr(href)", None),
+    "location": (".place::text", str.strip),
+    "date": (".date::text", str.strip),
+    "salary": (".salary::text", clean_salary),
+}
+DESCRIPTION_QUERY = ".vacancy-section ::text"
+DESCRIPTION = "description"
+# how css2xpath starts the XPath of every query
+ANCHOR_PREFIX = "descendant-or-self::*["
+
+
+class ParselExtractor:
+    # One response.css() call per field, each wrapping its matches in
+    # Selector objects
+
+    def __call__(self, response: Response) -> tuple[dict, list[str]]:
+        fields = {
+            name: first_text(response, query, clean)
+            for name, (query, clean) in DETAIL_FIELDS.items()
+        }
+
+        return fields, response.css(DESCRIPTION_QUERY).getall()
+
+
+def _split_query(query: str) -> tuple[str, str, str]:
+    # The XPath of a CSS query is that of its first element followed by the
+    # path below it: ".b-compinfo .info .l-n a::text" is the "b-compinfo"
+    # class, its XPath predicate and "/descendant::*[...info...]/.../a/text()"
+    anchor = query.split(" ", 1)[0].split("::", 1)[0]
+    anchor_xpath, xpath = css2xpath(anchor), css2xpath(query)
+    if not (
+        re.fullmatch(r"\.[\w-]+", anchor)
+        and anchor_xpath.startswith(ANCHOR_PREFIX)
+        and xpath.startswith(anchor_xpath)
+    ):
+        raise ValueError(f"{query!r} does not start with a class selector")
+
+    return anchor[1:], anchor_xpath[len(ANCHOR_PREFIX):-1], xpath[len(anchor_xpath):]
+
+
+class LxmlExtractor:
+    # The same queries run in a single walk of the tree parsel already parsed:
+    # one compiled XPath finds the elements with the class every query starts
+    # from, and the rest of each query only searches below the few elements
+    # it returns. Values are plain strings instead of Selector objects
+
+    def __init__(self):
+        predicates = {}
+        # class -> the fields whose query starts from it, with the path below
+        self.fields = defaultdict(list)
+        queries = {**DETAIL_FIELDS, DESCRIPTION: (DESCRIPTION_QUERY, None)}
+        for name, (query, clean) in queries.items():
+            anchor, predicate, below = _split_query(query)
+            predicates[predicate] = None
+            self.fields[anchor].append(
+                (name, etree.XPath(f"self::*{below}", smart_strings=False), clean)
+            )
+
+        self.anchors = etree.XPath(f"{ANCHOR_PREFIX}{' or '.join(predicates)}]")
+
+    def __call__(self, response: Response) -> tuple[dict, list[str]]:
+        fields = dict.fromkeys(DETAIL_FIELDS)
+        description = []
+        sections = set()
+
+        for element in self.anchors(response.selector.root):
+            for anchor in dict.fromkeys(element.get("class", "").split()):
+                for name, xpath, clean in self.fields.get(anchor, ()):
+                    if name == DESCRIPTION:
+                        # a section nested in another one was already read with it
+                        if not any(parent in sections for parent in element.iterancestors()):
+                            sections.add(element)
+                            description.extend(xpath(element))
+                        continue
+
+                    if fields[name] is not None:
+                        continue
+
+                    for value in xpath(element):
+                        value = clean(value) if clean is not None else value
+                        if value:
+                            fields[name] = value
+                            break
+
+        return fields, description
+
+
+# picked by benchmarks/extraction.py, which also checks both give the same fields
+EXTRACTORS = {"parsel": ParselExtractor, "lxml": LxmlExtractor}
+
+
+def get_extractor(name: str):
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor {name!r}, expected one of {list(EXTRACTORS)}")
+
+    return EXTRACTORS[name]()
@@ -0,0 +1,162 @@
+import re
+from bisect import bisect_right
+
+from src.config import MainConfig, ExtractExperiencePatterns
+
+
+def _normalize_term(term: str) -> str:
+    return "".join(term.lower().split())
+
+
+def _term_pattern(char: str) -> str:
+    if char == " ":
+        return r"\s+"
+    if char == "/":
+        return r"\s*/\s*"
+
+    return re.escape(char)
+
+
+def _trie_pattern(node: dict) -> str:
+    end = node.get("") is not None
+    branches = [
+        _term_pattern(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+
+    if not branches:
+        return ""
+
+    if len(branches) == 1 and not end:
+        return branches[0]
+
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if end else pattern
+
+
+class TechMatcher:
+    # A technology must be a whole token the same way the old
+    # `\b[\w.+#]+\b` tokenizer saw it: "python." counts, "python.org" does not.
+    # The left side is checked in python so the regex can start with the
+    # trie and let sre skip ahead on its first-character set.
+    RIGHT_BOUNDARY = r"(?!\w)(?![.+#]\w)"
+    WORD_CHAR = re.compile(r"\w")
+
+    def __init__(self, keywords: set[str], aliases: dict[str, str]):
+        self.canonical = {_normalize_term(keyword): keyword for keyword in keywords}
+        for alias, keyword in aliases.items():
+            self.canonical[_normalize_term(alias)] = keyword
+
+        trie = {}
+        for term in {" ".join(term.lower().split()) for term in [*keywords, *aliases]}:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        self.pattern = re.compile(_trie_pattern(trie) + self.RIGHT_BOUNDARY)
+
+    def _starts_token(self, text: str, start: int) -> bool:
+        if start == 0:
+            return True
+
+        if self.WORD_CHAR.match(text, start - 1):
+            return False
+
+        return not (
+            start > 1
+            and text[start - 1] in ".+#"
+            and self.WORD_CHAR.match(text, start - 2)
+        )
+
+    def find(self, text: str) -> list[str]:
+        text = text.lower()
+        found = {}
+
+        pos = 0
+        while (match := self.pattern.search(text, pos)) is not None:
+            if not self._starts_token(text, match.start()):
+                pos = match.start() + 1
+                continue
+
+            found.setdefault(self.canonical[_normalize_term(match.group())], None)
+            pos = match.end()
+
+        return list(found)
+
+
+TECH_MATCHER = TechMatcher(MainConfig.TECH_KEYWORDS, MainConfig.TECH_ALIASES)
+
+
+def extract_tech_stack(text: str) -> list[str]:
+    return TECH_MATCHER.find(text)
+
+
+def _experience_value(match: re.Match) -> float | None:
+    val = float(match.group(1).replace(",", "."))
+
+    if match.group(2) is not None:
+        return val if 0 < val < 15 else None
+
+    return val / 12
+
+
+def extract_experience(text: str) -> float | None:
+    clean_text = ExtractExperiencePatterns.DATE_GUARD.sub(" ", text)
+
+    candidates = list(ExtractExperiencePatterns.EXPERIENCE_PATTERN.finditer(clean_text))
+    if not candidates:
+        return None
+
+    # Statement bounds as SPLIT_PATTERN.split() would produce them
+    starts = [0]
+    ends = []
+    for separator in ExtractExperiencePatterns.SPLIT_PATTERN.finditer(clean_text):
+        ends.append(separator.start())
+        starts.append(separator.end())
+    ends.append(len(clean_text))
+
+    # None marks a statement where a candidate runs into the separator,
+    # e.g. "5 р. досвіду"; it is rescanned on its own like before
+    matches_by_statement: dict[int, list[re.Match] | None] = {}
+    for match in candidates:
+        index = bisect_right(starts, match.start()) - 1
+        if match.end() > ends[index]:
+            matches_by_statement[index] = None
+        elif index not in matches_by_statement:
+            matches_by_statement[index] = [match]
+        elif matches_by_statement[index] is not None:
+            matches_by_statement[index].append(match)
+
+    result = []
+    for index, matches in matches_by_statement.items():
+        statement = clean_text[starts[index]:ends[index]]
+        if ExtractExperiencePatterns.NON_REQ_CONTEXT.search(statement):
+            continue
+
+        if matches is None:
+            matches = ExtractExperiencePatterns.EXPERIENCE_PATTERN.finditer(statement)
+
+        for match in matches:
+            val = _experience_value(match)
+            if val is not None:
+                result.append(val)
+
+    return max(result, default=None)
+
+
+def clean_vacancy_text(vacancy_text: list[str]) -> str:
+    return re.sub(r"\s+", " ", " ".join(vacancy_text))
+
+
+def extract_vacancy_fields(
+    raw_vacancy_text: list[str],
+) -> tuple[str, float | None, list[str]]:
+    vacancy_text = clean_vacancy_text(raw_vacancy_text)
+
+    return (
+        vacancy_text,
+        extract_experience(vacancy_text),
+        extract_tech_stack(vacancy_text),
+    )
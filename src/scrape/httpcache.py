@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+from scrapy.http import Headers, Request
+from scrapy.responsetypes import responsetypes
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteCacheStorage:
+    # HTTP cache storage for scrapy's HttpCacheMiddleware.
+    # Bodies are zlib-compressed and stored once per sha256 digest; "responses"
+    # keeps the latest response per request fingerprint (with its ETag and
+    # Last-Modified for conditional GETs) and "snapshot_responses" records what
+    # every run saw, so a run can later be replayed exactly.
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bodies (
+            digest TEXT PRIMARY KEY,
+            body BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS responses (
+            fingerprint TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            headers BLOB NOT NULL,
+            digest TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            stored_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS snapshot_responses (
+            snapshot TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            url TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            headers BLOB NOT NULL,
+            digest TEXT NOT NULL,
+            PRIMARY KEY (snapshot, fingerprint)
+        );
+    """
+
+    def __init__(self, settings):
+        self.db_path = Path(settings["HTTPCACHE_SQLITE_PATH"])
+        self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.snapshot = settings.get("HTTPCACHE_SNAPSHOT")
+        self.replay_snapshot = settings.get("HTTPCACHE_REPLAY_SNAPSHOT")
+        self.conn = None
+
+    def open_spider(self, spider):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+        self._fingerprinter = spider.crawler.request_fingerprinter
+
+        if self.replay_snapshot:
+            logger.info(f"Replaying {self.replay_snapshot} from {self.db_path}")
+        else:
+            logger.info(f"Using sqlite HTTP cache {self.db_path}")
+
+    def close_spider(self, spider):
+        if self.replay_snapshot:
+            missing = spider.crawler.stats.get_value("httpcache/ignore", 0)
+            if missing:
+                logger.warning(
+                    f"{missing} requests of the replay are not recorded for "
+                    f"{self.replay_snapshot}, its snapshot is missing their rows"
+                )
+        else:
+            self._record_carried(getattr(spider, "carried_urls", []))
+
+        self.conn.commit()
+        self.conn.close()
+
+    def retrieve_response(self, spider, request):
+        fingerprint = self._fingerprinter.fingerprint(request).hex()
+
+        if self.replay_snapshot:
+            row = self.conn.execute(
+                "SELECT url, status, headers, digest FROM snapshot_responses "
+                "WHERE snapshot = ? AND fingerprint = ?",
+                (self.replay_snapshot, fingerprint),
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT url, status, headers, digest, stored_at FROM responses "
+                "WHERE fingerprint = ?",
+                (fingerprint,),
+            ).fetchone()
+
+            if row is not None:
+                if 0 < self.expiration_secs < time.time() - row[4]:
+                    return None
+
+                # The cached response may be revalidated with a 304 instead
+                # of being stored again, so it is part of this run already
+                self._record_snapshot(fingerprint, *row[:4])
+
+        if row is None:
+            return None
+
+        url, status, raw_headers, digest = row[:4]
+        (compressed,) = self.conn.execute(
+            "SELECT body FROM bodies WHERE digest = ?", (digest,)
+        ).fetchone()
+
+        body = zlib.decompress(compressed)
+        headers = Headers(headers_raw_to_dict(raw_headers))
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response):
+        fingerprint = self._fingerprinter.fingerprint(request).hex()
+        digest = hashlib.sha256(response.body).hexdigest()
+        raw_headers = headers_dict_to_raw(response.headers)
+
+        self.conn.execute(
+            "INSERT OR IGNORE INTO bodies (digest, body) VALUES (?, ?)",
+            (digest, zlib.compress(response.body)),
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                fingerprint,
+                response.url,
+                response.status,
+                raw_headers,
+                digest,
+                self._header(response, b"ETag"),
+                self._header(response, b"Last-Modified"),
+                time.time(),
+            ),
+        )
+        self._record_snapshot(
+            fingerprint, response.url, response.status, raw_headers, digest
+        )
+        self.conn.commit()
+
+    def _record_carried(self, urls: list[str]) -> None:
+        # Vacancies carried over from the previous snapshot are never requested.
+        # Their latest detail page is recorded for this run, so replaying it
+        # fetches them like the rest instead of dropping their rows
+        if not self.snapshot or not urls:
+            return
+
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO snapshot_responses "
+            "SELECT ?, fingerprint, url, status, headers, digest FROM responses "
+            "WHERE fingerprint = ?",
+            [
+                (self.snapshot, self._fingerprinter.fingerprint(Request(url)).hex())
+                for url in urls
+            ],
+        )
+        logger.info(f"Recorded the cached responses of {len(urls)} carried vacancies")
+
+    def _record_snapshot(self, fingerprint, url, status, raw_headers, digest):
+        if not self.snapshot:
+            return
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO snapshot_responses VALUES (?, ?, ?, ?, ?, ?)",
+            (self.snapshot, fingerprint, url, status, raw_headers, digest),
+        )
+
+    @staticmethod
+    def _header(response, name: bytes) -> str | None:
+        value = response.headers.get(name)
+        return value.decode("latin-1") if value else None
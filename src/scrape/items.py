@@ -3,37 +3,39 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
-import scrapy
-from itemloaders.processors import TakeFirst, MapCompose, Join, Identity
-from scrapy.loader import ItemLoader
+from dataclasses import dataclass
 
 
-class VacancyItem(scrapy.Item):
-    name = scrapy.Field()
-    url = scrapy.Field()
-    company_name = scrapy.Field()
-    company_url = scrapy.Field()
-    location = scrapy.Field()
-    date = scrapy.Field()
-    salary = scrapy.Field()
-    experience_years = scrapy.Field()
-    technologies = scrapy.Field()
-    description = scrapy.Field()
+@dataclass(slots=True)
+class Vacancy:
+    # What the spider yields. A slotted dataclass carries no per-item dict and
+    # ItemAdapter exports it like a scrapy.Item
+    name: str | None = None
+    url: str | None = None
+    company_name: str | None = None
+    company_url: str | None = None
+    location: str | None = None
+    date: str | None = None
+    salary: str | None = None
+    experience_years: float | str | None = None
+    technologies: list[str] | str | None = None
+    description: str | None = None
 
 
 def clean_text(value: str) -> str:
     return value.replace("\xa0", " ").strip()
 
 
-class VacancyLoader(ItemLoader):
-    default_output_processor = TakeFirst()
+def clean_salary(value: str) -> str:
+    return value.strip().replace("\xa0", " ")
 
-    name_in = MapCompose(str.strip)
-    company_name_in = MapCompose(str.strip)
-    location_in = MapCompose(str.strip)
-    date_in = MapCompose(str.strip)
-    salary_in = MapCompose(str.strip, lambda x: x.replace("\xa0", " "))
-    description_in = MapCompose(clean_text)
 
-    technologies_out = Identity()
-    description_out = Join(separator="\n")
+def first_text(selector, query: str, clean=None) -> str | None:
+    # what MapCompose(clean) + TakeFirst produce, without the intermediate list
+    for value in selector.css(query).getall():
+        if clean is not None:
+            value = clean(value)
+        if value:
+            return value
+
+    return None
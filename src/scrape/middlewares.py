@@ -3,7 +3,10 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import re
+
 from scrapy import signals
+from scrapy.http import TextResponse
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -54,9 +57,17 @@ class ScrapeSpiderMiddleware:
 
 
 class ScrapeDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    # Keeps the Django CSRF token of jobs.dou.ua so the paginated
+    # "xhr-load" POST requests of the vacancies list are accepted.
+    # Cookies themselves are handled by scrapy's CookiesMiddleware.
+
+    CSRF_COOKIE = "csrftoken"
+    CSRF_HTML_PATTERN = re.compile(
+        r"""(?:csrfmiddlewaretoken["']\s+value=|CSRF_TOKEN\s*=\s*)["']([\w-]+)["']"""
+    )
+
+    def __init__(self):
+        self.csrf_token = None
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -66,35 +77,39 @@ class ScrapeDownloaderMiddleware:
         return s
 
     def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
+        if not request.meta.get("dou_xhr"):
+            return None
+
+        if self.csrf_token is None:
+            spider.logger.warning(f"No CSRF token known yet for {request.url}")
+        else:
+            request.headers["X-CSRFToken"] = self.csrf_token
+
+        request.headers["X-Requested-With"] = "XMLHttpRequest"
         return None
 
     def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
+        token = self._token_from_cookies(response) or self._token_from_html(response)
+        if token and token != self.csrf_token:
+            spider.logger.debug(f"Got CSRF token from {response.url}")
+            self.csrf_token = token
 
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
         return response
 
-    def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
+    def _token_from_cookies(self, response):
+        for header in response.headers.getlist("Set-Cookie"):
+            name, _, value = header.decode("latin-1").split(";", 1)[0].partition("=")
+            if name.strip() == self.CSRF_COOKIE and value:
+                return value.strip()
 
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
+        return None
+
+    def _token_from_html(self, response):
+        if not isinstance(response, TextResponse) or response.meta.get("dou_xhr"):
+            return None
+
+        match = self.CSRF_HTML_PATTERN.search(response.text)
+        return match.group(1) if match else None
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
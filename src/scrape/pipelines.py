@@ -1,13 +1,32 @@
-# Define your item pipelines here
-#
-# Don't forget to add your pipeline to the ITEM_PIPELINES setting
-# See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
+from pathlib import Path
 
-
-# useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+
+from src.analysis.aggregates import RunningAggregates
+from src.config import MainConfig
 
 
 class ScrapePipeline:
-    def process_item(self, item, spider):
+    # Updates the plot aggregates as items arrive and saves them when the
+    # spider closes. The plots are drawn by the analysis, which has to read
+    # the feed back anyway to drop reposts the aggregates still count
+
+    def __init__(self, run_dir: Path):
+        self.run_dir = run_dir
+        self.aggregates = RunningAggregates()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("STREAMING_AGGREGATES_ENABLED") or not settings.get("RUN_DIR"):
+            raise NotConfigured
+
+        return cls(Path(settings["RUN_DIR"]))
+
+    def process_item(self, item):
+        self.aggregates.update(ItemAdapter(item))
         return item
+
+    def close_spider(self):
+        self.aggregates.save(self.run_dir / MainConfig.AGGREGATES_NAME)
@@ -0,0 +1,28 @@
+from typing import Any, BinaryIO
+
+
+class ZstdPlugin:
+    # Feed post-processing plugin like scrapy's GzipPlugin. Exporters write
+    # item by item and the compressor emits a block every zstd_write_size
+    # bytes, so the feed never sits uncompressed in memory or on disk.
+    # Accepts the zstd_level and zstd_write_size feed options.
+
+    def __init__(self, file: BinaryIO, feed_options: dict[str, Any]) -> None:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("zstd feeds need the zstandard package") from e
+
+        self.file = file
+        compressor = zstandard.ZstdCompressor(level=feed_options.get("zstd_level", 3))
+        self.writer = compressor.stream_writer(
+            file,
+            write_size=feed_options.get("zstd_write_size", zstandard.COMPRESSION_RECOMMENDED_OUTPUT_SIZE),
+            closefd=False,
+        )
+
+    def write(self, data: bytes) -> int:
+        return self.writer.write(data)
+
+    def close(self) -> None:
+        self.writer.close()
@@ -0,0 +1,42 @@
+import csv
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class SeenVacanciesIndex:
+    def __init__(self, path: Path):
+        self.path = path
+        self.seen: dict[str, str] = {}
+        self.current: dict[str, str] = {}
+
+        if path.exists():
+            self.seen = json.loads(path.read_text(encoding="utf-8"))
+            logger.info(f"Loaded {len(self.seen)} seen vacancies from {path}")
+
+    def is_unchanged(self, url: str, date: str) -> bool:
+        return url in self.seen and self.seen[url] == date
+
+    def mark(self, url: str, date: str) -> None:
+        self.current[url] = date
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(self.current, ensure_ascii=False, indent=1), encoding="utf-8"
+        )
+        tmp_path.replace(self.path)
+
+        logger.info(f"Saved {len(self.current)} seen vacancies to {self.path}")
+
+
+def load_snapshot_rows(csv_path: Path | None) -> dict[str, dict[str, str]]:
+    if csv_path is None or not csv_path.exists():
+        return {}
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return {row["url"]: row for row in csv.DictReader(f)}
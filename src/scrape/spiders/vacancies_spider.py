@@ -0,0 +1,309 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from urllib.parse import urljoin, urlencode
+
+import scrapy
+from parsel import Selector
+from scrapy.http import Response, HtmlResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet.defer import Deferred
+
+from src.config import MainConfig
+from src.scrape.extractors import (
+    clean_vacancy_text,
+    extract_experience,
+    extract_tech_stack,
+    extract_vacancy_fields,
+)
+from src.instrumentation import Metrics
+from src.scrape.checkpoint import load_checkpoint
+from src.scrape.extraction import get_extractor
+from src.scrape.items import Vacancy, clean_text
+from src.scrape.seen_index import SeenVacanciesIndex, load_snapshot_rows
+
+
+def future_to_deferred(future: Future) -> Deferred:
+    from twisted.internet import reactor
+
+    deferred = Deferred()
+
+    def resolve(done: Future) -> None:
+        error = done.exception()
+        if error is not None:
+            reactor.callFromThread(deferred.errback, error)
+        else:
+            reactor.callFromThread(deferred.callback, done.result())
+
+    future.add_done_callback(resolve)
+    return deferred
+
+
+class VacanciesSpider(scrapy.Spider):
+    category: str = None
+
+    def __init__(
+        self,
+        *args,
+        list_mode: str = MainConfig.LIST_LOADING_MODE,
+        incremental: bool = False,
+        seen_index_path: Path | None = None,
+        previous_snapshot: Path | None = None,
+        done_urls: set[str] | None = None,
+        checkpoint_path: Path | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+
+        if not self.category:
+            raise ValueError(f"{type(self).__name__} has no DOU category")
+
+        query = urlencode({"category": self.category})
+        self.target_url = urljoin(MainConfig.DOU_URL, f"{MainConfig.VACANCIES_PATH}?{query}")
+        self.xhr_url = urljoin(MainConfig.DOU_URL, f"{MainConfig.VACANCIES_XHR_PATH}?{query}")
+
+        if list_mode not in ("xhr", "selenium"):
+            raise ValueError(f"Unknown list loading mode: {list_mode}")
+
+        self.list_mode = list_mode
+        self.loaded_count = 0
+        self.list_complete = False
+        self.metrics = Metrics()
+
+        # Resuming: urls already in the feed are never fetched again
+        self.done_urls = done_urls
+        self.resume_urls = []
+        if done_urls is not None:
+            checkpoint = load_checkpoint(Path(checkpoint_path))
+            self.resume_urls = sorted(set(checkpoint["discovered"]) - done_urls)
+            self.list_complete = checkpoint["list_complete"]
+            self.metrics.incr("items_resumed", len(self.resume_urls))
+            self.logger.info(
+                f"Resuming with {len(done_urls)} vacancies in the feed and "
+                f"{len(self.resume_urls)} left to fetch"
+                + ("" if self.list_complete else ", reading the list again")
+            )
+
+        self.seen_index = None
+        self.previous_rows = {}
+        # recorded in the HTTP cache under this snapshot, see SqliteCacheStorage
+        self.carried_urls = []
+        if incremental and seen_index_path:
+            self.seen_index = SeenVacanciesIndex(Path(seen_index_path))
+            self.previous_rows = load_snapshot_rows(
+                Path(previous_snapshot) if previous_snapshot else None
+            )
+            self.logger.info(
+                f"Incremental mode: {len(self.previous_rows)} rows "
+                f"in previous snapshot {previous_snapshot}"
+            )
+
+        self.parse_executor = None
+        self.extractor = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+
+        spider.extractor = get_extractor(crawler.settings["DETAIL_EXTRACTOR"])
+
+        workers = crawler.settings.getint("PARSE_WORKERS")
+        if workers > 0:
+            spider.logger.info(f"Parsing vacancy text in {workers} worker processes")
+            spider.parse_executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn")
+            )
+
+        return spider
+
+    def click_more_button(self, driver):
+        from selenium.common import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.wait import WebDriverWait
+
+        wait = WebDriverWait(driver, 5)
+
+        while True:
+            try:
+                current_count = len(
+                    driver.find_elements(By.CSS_SELECTOR, ".l-vacancy")
+                )
+                self.logger.info(f"Loaded vacancies. Current total: {current_count}")
+                more_button = wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, ".more-btn"))
+                )
+
+                if not more_button.is_displayed():
+                    self.logger.info("'More' button is hidden. Stopping")
+                    break
+
+                driver.execute_script(
+                    "arguments[0].scrollIntoView();", more_button
+                )
+                more_button.click()
+
+                wait.until(
+                    lambda d: len(d.find_elements(By.CSS_SELECTOR, ".l-vacancy"))
+                    > current_count
+                )
+
+            except TimeoutException:
+                self.logger.info("'More' button not found or timeout reached")
+                break
+            except Exception as e:
+                self.logger.error(f"Loop interrupted: {e}")
+                break
+
+    def start_requests(self):
+        for url in self.resume_urls:
+            yield scrapy.Request(url, callback=self.parse_single_vacancy)
+
+        if self.list_complete:
+            return
+
+        if self.list_mode == "xhr":
+            yield scrapy.Request(self.target_url, callback=self.parse_vacancies)
+            return
+
+        # rendered by BrowserPoolMiddleware, which clicks "More" until the list is complete
+        yield scrapy.Request(
+            self.target_url,
+            callback=self.parse_vacancies,
+            meta={"render_js": True, "browser_action": "click_more_button"},
+        )
+
+    def _next_page_request(self, count: int) -> scrapy.FormRequest:
+        # the offset travels with the request, as a resumed queue restarts loaded_count
+        return scrapy.FormRequest(
+            self.xhr_url,
+            formdata={"count": str(count)},
+            headers={"Referer": self.target_url},
+            meta={"dou_xhr": True, "list_offset": count},
+            callback=self.parse_xhr_page,
+        )
+
+    def parse_vacancies(self, response: HtmlResponse):
+        vacancies = response.css(".l-vacancy")
+        yield from self._parse_listing(response, vacancies)
+
+        if self.list_mode == "xhr":
+            yield self._next_page_request(len(vacancies))
+        else:
+            self.list_complete = True
+
+    def parse_xhr_page(self, response: Response):
+        data = response.json()
+        vacancies = Selector(text=data.get("html") or "<ul></ul>").css(".l-vacancy")
+
+        yield from self._parse_listing(response, vacancies)
+
+        if data.get("last") or not vacancies:
+            self.list_complete = True
+            self.logger.info(f"Reached the last list page. Loaded {self.loaded_count}")
+            return
+
+        yield self._next_page_request(response.meta["list_offset"] + len(vacancies))
+
+    def _parse_listing(self, response: Response, vacancies):
+        self.loaded_count += len(vacancies)
+        self.metrics.incr("list_pages")
+        self.metrics.incr("list_vacancies", len(vacancies))
+        self.logger.info(
+            f"Found {len(vacancies)} vacancies. Current total: {self.loaded_count}"
+        )
+
+        carried_count = 0
+        for vacancy in vacancies:
+            href = vacancy.css(".title .vt::attr(href)").get()
+            if not href:
+                continue
+
+            url = response.urljoin(href)
+            if self.done_urls is not None and url in self.done_urls:
+                continue
+
+            if self.seen_index is not None:
+                date = (vacancy.css(".date::text").get() or "").strip()
+                self.seen_index.mark(url, date)
+
+                if self.seen_index.is_unchanged(url, date) and url in self.previous_rows:
+                    carried_count += 1
+                    self.carried_urls.append(url)
+                    if self.done_urls is not None:
+                        self.done_urls.add(url)
+                    yield Vacancy(**self.previous_rows[url])
+                    continue
+
+            yield response.follow(url, self.parse_single_vacancy)
+
+        if self.seen_index is not None:
+            self.metrics.incr("items_carried", carried_count)
+            self.logger.info(
+                f"Carried {carried_count} unchanged vacancies from previous snapshot"
+            )
+
+    async def parse_single_vacancy(self, response: Response):
+        if self.done_urls is not None:
+            # a request restored from the job queue may also be in the checkpoint
+            if response.url in self.done_urls:
+                return
+            self.done_urls.add(response.url)
+
+        self.logger.info(f"Visited {response.url}")
+
+        fields, raw_vacancy_text = self.extractor(response)
+
+        if self.parse_executor is None:
+            with self.metrics.timer("extract"):
+                vacancy_text, xp_years, found_tech = extract_vacancy_fields(raw_vacancy_text)
+        else:
+            future = self.parse_executor.submit(extract_vacancy_fields, raw_vacancy_text)
+            with self.metrics.timer("extract_pool_wait"):
+                vacancy_text, xp_years, found_tech = await maybe_deferred_to_future(
+                    future_to_deferred(future)
+                )
+        self.metrics.incr("items_parsed")
+
+        yield self.build_vacancy(response.url, fields, vacancy_text, xp_years, found_tech)
+
+    @staticmethod
+    def build_vacancy(
+        url: str, fields: dict, vacancy_text: str, xp_years: float | None, found_tech
+    ) -> Vacancy:
+        return Vacancy(
+            url=url,
+            **fields,
+            experience_years=xp_years or None,
+            technologies=list(found_tech),
+            description=clean_text(vacancy_text),
+        )
+
+    @staticmethod
+    def clean_vacancy_text(vacancy_text: list[str]) -> str:
+        return clean_vacancy_text(vacancy_text)
+
+    @staticmethod
+    def extract_experience(text: str) -> float | None:
+        return extract_experience(text)
+
+    @staticmethod
+    def extract_tech_stack(text: str) -> list[str]:
+        return extract_tech_stack(text)
+
+    def closed(self, reason):
+        if self.parse_executor is not None:
+            self.parse_executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.seen_index is not None and reason == "finished":
+            self.seen_index.save()
+
+
+def make_vacancies_spider(field: str, category: str) -> type[VacanciesSpider]:
+    class_name = f"{field.title().replace('-', '')}VacanciesSpider"
+
+    return type(
+        class_name,
+        (VacanciesSpider,),
+        {"name": f"{field}-vacancies", "category": category, "__module__": __name__},
+    )
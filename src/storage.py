@@ -0,0 +1,85 @@
+import logging
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from src.config import MainConfig
+
+logger = logging.getLogger(__name__)
+
+RAW_SCHEMA = pa.schema(
+    [
+        ("name", pa.string()),
+        ("company_name", pa.string()),
+        ("salary", pa.string()),
+        ("experience_years", pa.float64()),
+        ("date", pa.string()),
+        ("location", pa.dictionary(pa.int32(), pa.string())),
+        ("technologies", pa.dictionary(pa.int32(), pa.string())),
+        ("url", pa.string()),
+        ("company_url", pa.string()),
+        ("description", pa.string()),
+    ]
+)
+
+RAW_CSV_DTYPES = {
+    "name": "string",
+    "company_name": "string",
+    "salary": "string",
+    "experience_years": "float64",
+    "date": "string",
+    "location": "category",
+    "technologies": "category",
+    "url": "string",
+    "company_url": "string",
+    "description": "string",
+}
+
+
+def to_float(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_parquet_path(csv_path: Path) -> Path:
+    return csv_path.with_name(MainConfig.PARQUET_NAME)
+
+
+def resolve_snapshot_file(path: Path) -> Path:
+    if path.is_dir():
+        for name in (MainConfig.PARQUET_NAME, MainConfig.CSV_NAME):
+            if (path / name).exists():
+                return path / name
+
+        raise FileNotFoundError(f"No snapshot data in {path}")
+
+    if path.suffix == ".csv" and get_parquet_path(path).exists():
+        return get_parquet_path(path)
+
+    return path
+
+
+def load_snapshot(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    path = resolve_snapshot_file(Path(path))
+    logger.info(f"Loading {columns or 'all columns'} from {path}")
+
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+
+    dtypes = {
+        name: dtype
+        for name, dtype in RAW_CSV_DTYPES.items()
+        if columns is None or name in columns
+    }
+    return pd.read_csv(path, usecols=columns, dtype=dtypes)
+
+
+def save_snapshot(df: pd.DataFrame, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False)
+    logger.info(f"Saved {len(df)} rows to {path}")
+
+    return path